@@ -0,0 +1,249 @@
+from typing import Optional, Union
+import numpy as np
+from .players.base import Player
+from .players.basic import BasicStrategyPlayer
+from .players.chart import ChartPlayer1, ChartPlayer2, RuleChartPlayer
+from .card import CODE_VALUE_INDEX
+from .charts import load_chart
+from .rules import HouseRules
+from .utils.player_utils import ACTIONS, MAX_TOTAL, NUM_DEALER_INDICES, StrategyTable
+
+STAND, HIT, DOUBLE, SURRENDER = (ACTIONS.index(a) for a in ("stand", "hit", "double", "surrender"))
+
+WIN, LOSS, PUSH, BLACKJACK, SURR_LOSS = 0, 1, 2, 3, 4
+
+# Cards are tracked by the value index from card.py: 0-8 for 2-10, 9 for the ace
+ACE = 9
+CLASS_HARD_VALUES = np.array([2, 3, 4, 5, 6, 7, 8, 9, 10, 1], dtype=np.int16)
+CLASS_DECK_COUNTS = np.bincount(np.frombuffer(CODE_VALUE_INDEX, dtype=np.uint8)).astype(np.int16)
+
+
+def compiled_table(strategy: StrategyTable) -> np.ndarray:
+    return np.frombuffer(strategy.codes, dtype=np.int8).reshape(MAX_TOTAL + 1, 2, NUM_DEALER_INDICES)
+
+
+def _basic_table() -> np.ndarray:
+    table = np.full((MAX_TOTAL + 1, 2, NUM_DEALER_INDICES), HIT, dtype=np.int8)
+    table[12:17, :, :5] = STAND
+    table[17:] = STAND
+    return table
+
+
+def strategy_table(player: Player, rules: Optional[HouseRules] = None) -> np.ndarray:
+    if isinstance(player, RuleChartPlayer):
+        return compiled_table(load_chart(rules if rules is not None else HouseRules()))
+    if isinstance(player, (ChartPlayer1, ChartPlayer2)):
+        return compiled_table(player.strategy)
+    if isinstance(player, BasicStrategyPlayer):
+        return _basic_table()
+    raise TypeError(f"{type(player).__name__} is not supported by the batch engine")
+
+
+def _deplete(counts: np.ndarray, depth: np.ndarray, rng: np.random.Generator) -> None:
+    remaining = counts.sum(axis=1)
+    for rank in range(counts.shape[1]):
+        removed = rng.hypergeometric(counts[:, rank], remaining - counts[:, rank], depth)
+        remaining -= counts[:, rank]
+        counts[:, rank] -= removed
+        depth -= removed
+
+
+def _draw(
+    counts: np.ndarray, rows: np.ndarray, rng: np.random.Generator, replace: bool = False
+) -> np.ndarray:
+    sub = counts[rows]
+    cum = np.cumsum(sub, axis=1)
+    pick = rng.integers(0, cum[:, -1])
+    drawn = (cum <= pick[:, None]).sum(axis=1)
+    if replace:
+        return drawn
+    sub[np.arange(len(rows)), drawn] -= 1
+    counts[rows] = sub
+    return drawn
+
+
+def _best_total(hard: np.ndarray, aces: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    soft = aces & (hard + 10 <= MAX_TOTAL)
+    best = np.where(soft, hard + 10, hard)
+    return best, soft & (best < MAX_TOTAL)
+
+
+def _play_batch(
+    table: np.ndarray, rules: HouseRules, n: int, rng: np.random.Generator
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    counts = np.tile(CLASS_DECK_COUNTS * rules.num_decks, (n, 1))
+    if not (rules.continuous_reshuffle or rules.infinite_deck):
+        shoe_size = int(counts[0].sum())
+        # Deal each hand from a random point before the cut card, like a shoe reshuffled at the threshold
+        cut = int(shoe_size * (1 - rules.reshuffle_threshold))
+        _deplete(counts, rng.integers(0, cut + 1, size=n), rng)
+    every = np.arange(n)
+
+    p1 = _draw(counts, every, rng, rules.infinite_deck)
+    up = _draw(counts, every, rng, rules.infinite_deck)
+    p2 = _draw(counts, every, rng, rules.infinite_deck)
+    hole = _draw(counts, every, rng, rules.infinite_deck)
+
+    p_hard = CLASS_HARD_VALUES[p1] + CLASS_HARD_VALUES[p2]
+    p_aces = (p1 == ACE) | (p2 == ACE)
+    d_hard = CLASS_HARD_VALUES[up] + CLASS_HARD_VALUES[hole]
+    d_aces = (up == ACE) | (hole == ACE)
+    p_blackjack = p_aces & (p_hard == 11)
+    d_blackjack = d_aces & (d_hard == 11)
+
+    outcome = np.full(n, PUSH, dtype=np.int8)
+    doubled = np.zeros(n, dtype=bool)
+    resolved = p_blackjack.copy()
+    outcome[p_blackjack & ~d_blackjack] = BLACKJACK
+
+    active = ~resolved
+    while active.any():
+        rows = np.nonzero(active)[0]
+        best, soft = _best_total(p_hard[rows], p_aces[rows])
+        action = table[best, soft.astype(np.int8), up[rows]]
+
+        surrendering = rows[action == SURRENDER]
+        outcome[surrendering] = SURR_LOSS
+        resolved[surrendering] = True
+
+        doubling = rows[action == DOUBLE]
+        doubled[doubling] = True
+
+        drawing = rows[(action == HIT) | (action == DOUBLE)]
+        if len(drawing):
+            card = _draw(counts, drawing, rng, rules.infinite_deck)
+            p_hard[drawing] += CLASS_HARD_VALUES[card]
+            p_aces[drawing] |= card == ACE
+
+        active[rows[action != HIT]] = False
+        active &= p_hard <= MAX_TOTAL
+
+    busted = ~resolved & (p_hard > MAX_TOTAL)
+    outcome[busted] = LOSS
+    resolved |= busted
+
+    dealer_blackjack = ~resolved & d_blackjack
+    outcome[dealer_blackjack] = LOSS
+    resolved |= dealer_blackjack
+
+    dealing = ~resolved
+    while dealing.any():
+        rows = np.nonzero(dealing)[0]
+        best, soft = _best_total(d_hard[rows], d_aces[rows])
+        hits = (best < 17) | ((best == 17) & soft & rules.dealer_hits_soft_17)
+        rows = rows[hits]
+        if len(rows):
+            card = _draw(counts, rows, rng, rules.infinite_deck)
+            d_hard[rows] += CLASS_HARD_VALUES[card]
+            d_aces[rows] |= card == ACE
+        dealing[:] = False
+        dealing[rows] = True
+
+    p_best, _ = _best_total(p_hard, p_aces)
+    d_best, _ = _best_total(d_hard, d_aces)
+    compared = ~resolved
+    outcome[compared & ((d_hard > MAX_TOTAL) | (p_best > d_best))] = WIN
+    outcome[compared & (d_hard <= MAX_TOTAL) & (p_best < d_best)] = LOSS
+
+    payout = np.zeros(n, dtype=np.float64)
+    payout[outcome == WIN] = 1.0
+    payout[outcome == LOSS] = -1.0
+    payout[outcome == BLACKJACK] = rules.blackjack_payout
+    payout[outcome == SURR_LOSS] = -0.5
+    return outcome, payout, doubled
+
+
+def _settle(
+    payout: np.ndarray, doubled: np.ndarray, bankroll: float, bet: int
+) -> tuple[np.ndarray, np.ndarray, Optional[int]]:
+    profit = payout * bet * np.where(doubled, 2, 1)
+    start = 0
+    while start < len(profit):
+        bank = bankroll + np.cumsum(profit[start:])
+        before = np.concatenate(([bankroll], bank[:-1]))
+        short = (before < bet) | (doubled[start:] & (before < bet * 2))
+        if not short.any():
+            break
+        i = int(np.argmax(short))
+        if before[i] < bet:
+            return profit[: start + i], doubled[: start + i], start + i
+        # The scalar engine still deals the double card but keeps the original bet
+        profit[start + i] /= 2
+        doubled[start + i] = False
+        if i > 0:
+            bankroll = float(bank[i - 1])
+        start += i
+    return profit, doubled, None
+
+
+def run_batch_sim(
+    players: list[Player],
+    rules: HouseRules = None,
+    num_hands: int = 1000,
+    base_bet: int = 5,
+    verbose: bool = False,
+    seed: Optional[int] = None,
+    batch_size: int = 250_000,
+) -> list[dict[str, Union[int, float, list]]]:
+    if rules is None:
+        rules = HouseRules()
+
+    rng = np.random.default_rng(seed)
+    results = []
+    for player in players:
+        table = strategy_table(player, rules)
+        starting_bankroll = player.bankroll
+        wins = losses = pushes = doubles = 0
+        bankroll_history: list[float] = []
+        cum_winrates: list[float] = []
+
+        played = 0
+        while played < num_hands:
+            n = min(batch_size, num_hands - played)
+            outcome, payout, doubled = _play_batch(table, rules, n, rng)
+            profit, doubled, broke_at = _settle(payout, doubled, player.bankroll, base_bet)
+            outcome = outcome[: len(profit)]
+
+            won = (outcome == WIN) | (outcome == BLACKJACK)
+            lost = (outcome == LOSS) | (outcome == SURR_LOSS)
+            history = player.bankroll + np.cumsum(profit)
+            cum_wins = wins + np.cumsum(won)
+            cum_total = wins + losses + pushes + np.arange(1, len(profit) + 1)
+
+            wins += int(won.sum())
+            losses += int(lost.sum())
+            pushes += int((outcome == PUSH).sum())
+            doubles += int(doubled.sum())
+            bankroll_history.extend(history.tolist())
+            cum_winrates.extend((cum_wins / cum_total).tolist())
+            if len(history):
+                player.bankroll = float(history[-1])
+            played += len(profit)
+
+            if broke_at is not None:
+                bankroll_history.append(player.bankroll)
+                total = wins + losses + pushes
+                if total > 0:
+                    cum_winrates.append(wins / total)
+                if verbose:
+                    print(f"{repr(player)} broke at hand {played}")
+                break
+
+        total_games = wins + losses + pushes
+        decisive = wins + losses
+        final_bankroll = bankroll_history[-1] if bankroll_history else starting_bankroll
+        results.append({
+            "player": repr(player),
+            "wins": wins,
+            "losses": losses,
+            "pushes": pushes,
+            "doubles": doubles,
+            "total_games": total_games,
+            "win_rate": wins / decisive if decisive > 0 else 0.0,
+            "final_bankroll": final_bankroll,
+            "net_profit": final_bankroll - starting_bankroll,
+            "bankroll_history": bankroll_history,
+            "cum_winrate": cum_winrates,
+        })
+
+    return results
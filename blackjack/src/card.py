@@ -1,29 +1,51 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from typing import Optional
 import random
 
 SUITS = ["♠", "♥", "♦", "♣"]
 RANKS = ["A", "2", "3", "4", "5", "6", "7", "8", "9", "10", "J", "Q", "K"]
 
+# Hard value of each rank index, aces counted as 11
+RANK_VALUES = (11, 2, 3, 4, 5, 6, 7, 8, 9, 10, 10, 10, 10)
+# Value index of each rank index: 0-8 for 2-10, 9 for the ace (dealer chart column order)
+RANK_VALUE_INDEX = (9, 0, 1, 2, 3, 4, 5, 6, 7, 8, 8, 8, 8)
+ACE_RANK = 0
+
+# A card code is suit * 13 + rank index, so a shoe is a bytearray of codes
+NUM_CODES = len(SUITS) * len(RANKS)
+CODE_RANKS = bytes(code % len(RANKS) for code in range(NUM_CODES))
+CODE_VALUES = bytes(RANK_VALUES[rank] for rank in CODE_RANKS)
+CODE_VALUE_INDEX = bytes(RANK_VALUE_INDEX[rank] for rank in CODE_RANKS)
+
+
 @dataclass(frozen=True)
 class Card:
     rank: str
     suit: str
+    code: int = field(init=False, repr=False, compare=False)
+    hard_value: int = field(init=False, repr=False, compare=False)
+    value_index: int = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        rank_index = RANKS.index(self.rank)
+        object.__setattr__(self, "code", SUITS.index(self.suit) * len(RANKS) + rank_index)
+        object.__setattr__(self, "hard_value", RANK_VALUES[rank_index])
+        object.__setattr__(self, "value_index", RANK_VALUE_INDEX[rank_index])
 
     def __str__(self) -> str:
         return f"{self.rank}{self.suit}"
 
-    @property
-    def hard_value(self) -> int:
-        if self.rank == "A":
-            return 11
-        if self.rank in {"J", "Q", "K"}:
-            return 10
-        return int(self.rank)
 
+CARDS: tuple[Card, ...] = tuple(
+    Card(RANKS[code % len(RANKS)], SUITS[code // len(RANKS)]) for code in range(NUM_CODES)
+)
 
-def build_shoe(num_decks: int = 1) -> list[Card]:
-    shoe: list[Card] = [
-        Card(rank, suit) for _ in range(num_decks) for suit in SUITS for rank in RANKS
-    ]
-    random.shuffle(shoe)
+
+def build_shoe_codes(num_decks: int = 1, rng: Optional[random.Random] = None) -> bytearray:
+    shoe = bytearray(range(NUM_CODES)) * num_decks
+    (rng or random).shuffle(shoe)
     return shoe
+
+
+def build_shoe(num_decks: int = 1, rng: Optional[random.Random] = None) -> list[Card]:
+    return [CARDS[code] for code in build_shoe_codes(num_decks, rng)]
@@ -0,0 +1,157 @@
+from typing import Optional
+from pathlib import Path
+import json
+import os
+import tempfile
+from .ev import ACE_INDEX, INDEX_LOW_VALUES, dealer_distribution, shoe_composition
+from .rules import HouseRules
+from .utils.player_utils import NUM_DEALER_INDICES, StrategyTable, compile_strategy
+
+CHART_DIR = Path(__file__).resolve().parent.parent / "_charts"
+CHART_VERSION = 2
+
+# Only these fields change the optimal decisions, so sweeps over payouts or
+# penetration reuse one chart
+CHART_RULE_FIELDS = (
+    "num_decks",
+    "dealer_hits_soft_17",
+    "double_allowed",
+    "surrender",
+    "infinite_deck",
+)
+# An infinite deck is approximated by a shoe this large
+INFINITE_DECKS = 1000
+
+HARD_OFFSET = 4
+SOFT_OFFSET = 12
+ACTION_CHARS = {"stand": "s", "hit": "h", "double": "d", "surrender": "r"}
+
+_loaded: dict[str, StrategyTable] = {}
+
+
+def chart_key(rules: HouseRules) -> str:
+    return rules.fingerprint(CHART_RULE_FIELDS)
+
+
+def _double_totals(rules: HouseRules) -> range:
+    if rules.double_allowed == "any":
+        return range(HARD_OFFSET, 22)
+    if rules.double_allowed == "none":
+        return range(0)
+    low, high = (int(total) for total in rules.double_allowed.split("-"))
+    return range(low, high + 1)
+
+
+def _stand_ev(dealer: dict, total: int) -> float:
+    ev = dealer["bust"] - dealer["blackjack"]
+    for dealer_total in (17, 18, 19, 20, 21):
+        if total > dealer_total:
+            ev += dealer[dealer_total]
+        elif total < dealer_total:
+            ev -= dealer[dealer_total]
+    return ev
+
+
+def _upcard_chart(rules: HouseRules, upcard: int) -> dict[tuple[int, bool], str]:
+    # Total-dependent: the dealer's outcomes are exact for the shoe minus the
+    # upcard, and the player draws from that same shoe whatever their cards are
+    counts = list(shoe_composition(INFINITE_DECKS if rules.infinite_deck else rules.num_decks))
+    counts[upcard] -= 1
+    dealer = dealer_distribution(tuple(counts), upcard, rules)
+    remaining = sum(counts)
+    draws = [(INDEX_LOW_VALUES[index], index == ACE_INDEX, count / remaining) for index, count in enumerate(counts)]
+
+    doubles = _double_totals(rules)
+    surrender = rules.surrender != "none"
+    stand = {}
+    best = {}
+    actions = {}
+
+    def best_total(hard: int, has_ace: bool) -> int:
+        return hard + 10 if has_ace and hard <= 11 else hard
+
+    # Hard totals only grow, so states are solved from 21 down. A state with
+    # an ace and a hard total of 12 or more plays like the same total without one
+    for hard in range(21, 1, -1):
+        for has_ace in (False, True):
+            total = best_total(hard, has_ace)
+            stand_ev = _stand_ev(dealer, total)
+            hit_ev = 0.0
+            double_ev = 0.0
+            for value, is_ace, p in draws:
+                new_hard = hard + value
+                if new_hard > 21:
+                    hit_ev -= p
+                    double_ev -= 2 * p
+                    continue
+                new_ace = (has_ace or is_ace) and new_hard <= 11
+                hit_ev += p * best[(new_hard, new_ace)]
+                double_ev += 2 * p * _stand_ev(dealer, best_total(new_hard, has_ace or is_ace))
+
+            # Game allows doubling and surrendering at any point of the hand
+            options = {"stand": stand_ev, "hit": hit_ev}
+            # double_allowed restricts soft hands by their soft total too
+            if total in doubles:
+                options["double"] = double_ev
+            if surrender:
+                options["surrender"] = -0.5
+            action = max(options, key=options.get)
+            state = (hard, has_ace and hard <= 11)
+            stand[state] = stand_ev
+            best[state] = options[action]
+            actions[state] = action
+    return actions
+
+
+def generate_chart(rules: HouseRules) -> dict[str, list[list[str]]]:
+    columns = [_upcard_chart(rules, upcard) for upcard in range(NUM_DEALER_INDICES)]
+    hard = [
+        [ACTION_CHARS[column[(total, False)]] for column in columns]
+        for total in range(HARD_OFFSET, 22)
+    ]
+    # Soft totals 12-21 are an ace counted as 11 on a hard total of 2-11
+    soft = [
+        [ACTION_CHARS[column[(total - 10, True)]] for column in columns]
+        for total in range(SOFT_OFFSET, 22)
+    ]
+    return {"hard": hard, "soft": soft}
+
+
+def load_chart(rules: HouseRules, directory: Optional[Path] = None) -> StrategyTable:
+    key = chart_key(rules)
+    if key in _loaded:
+        return _loaded[key]
+
+    path = Path(directory or CHART_DIR) / f"{key}.json"
+    chart = None
+    if path.exists():
+        # A file that can't be read is regenerated like a missing one
+        try:
+            with open(path) as f:
+                chart = json.load(f)
+        except (OSError, ValueError):
+            chart = None
+        if not isinstance(chart, dict) or chart.get("version") != CHART_VERSION:
+            chart = None
+
+    if chart is None:
+        chart = {
+            "version": CHART_VERSION,
+            "rules": {name: getattr(rules, name) for name in CHART_RULE_FIELDS},
+            **generate_chart(rules),
+        }
+        # Sweep and run_sim workers can generate the same chart at once, so
+        # each writes its own temporary file and the last rename wins
+        os.makedirs(path.parent, exist_ok=True)
+        descriptor, temporary = tempfile.mkstemp(dir=path.parent, prefix=f"{key}.", suffix=".tmp")
+        try:
+            with os.fdopen(descriptor, "w") as f:
+                json.dump(chart, f, indent=1)
+            os.replace(temporary, path)
+        except BaseException:
+            os.unlink(temporary)
+            raise
+
+    table = compile_strategy(chart["hard"], chart["soft"], hard_offset=HARD_OFFSET, soft_offset=SOFT_OFFSET)
+    _loaded[key] = table
+    return table
@@ -0,0 +1,118 @@
+from typing import Optional, Union
+import copy
+import random
+import numpy as np
+from .game import Game
+from .players.base import Player
+from .risk import MEASURING_BANKROLL
+from .rules import HouseRules
+from .shoe import Shoe
+from .simulation import spawn_rngs
+
+
+class SwappedShoe(Shoe):
+    # Deals the same shuffle as a Shoe with the same RNG, except that the
+    # player's and the dealer's opening cards trade places every round: the
+    # antithetic partner of that shoe while their cursors stay in step
+    def shuffle(self) -> None:
+        super().shuffle()
+        self.swap_opening()
+
+    def swap_opening(self) -> None:
+        # Opening cards are dealt player, dealer, player, dealer
+        cards, cursor = self.cards, self.cursor
+        if cursor + 4 <= self.size:
+            cards[cursor], cards[cursor + 1] = cards[cursor + 1], cards[cursor]
+            cards[cursor + 2], cards[cursor + 3] = cards[cursor + 3], cards[cursor + 2]
+
+
+def _paired_games(
+    players: list[Player], rules: HouseRules, base_bet: int, shoe_seed: int, shoe_type: type[Shoe]
+) -> list[Game]:
+    games = []
+    for player in players:
+        # Identically seeded shoes shuffle identically as long as their cursors stay in step
+        shoe = shoe_type(rules.num_decks, random.Random(shoe_seed), rules.reshuffle_threshold)
+        game = Game(rules=rules, player=player, bet=base_bet, shoe=shoe)
+        if hasattr(player, "on_event"):
+            game.add_observer(player)
+        games.append(game)
+    return games
+
+
+def _play_in_step(games: list[Game], profits: np.ndarray, hand: int) -> None:
+    # Every round starts from a bankroll that can't run out, so no player's
+    # results are cut short by the broke check. Every shoe resumes after the
+    # furthest card dealt, so the next round starts from the same card
+    for i, game in enumerate(games):
+        game.player.bankroll = MEASURING_BANKROLL
+        game.play_round()
+        profits[i, hand] = game.player.bankroll - MEASURING_BANKROLL
+    furthest = max(game.shoe.cursor for game in games)
+    for game in games:
+        game.shoe.burn(furthest - game.shoe.cursor)
+        if isinstance(game.shoe, SwappedShoe):
+            game.shoe.swap_opening()
+
+
+def compare_players(
+    players: list[Player],
+    rules: HouseRules = None,
+    num_hands: int = 10_000,
+    base_bet: int = 5,
+    seed: Optional[int] = None,
+    antithetic: bool = False,
+    baseline: int = 0,
+) -> list[dict[str, Union[str, int, float]]]:
+    if rules is None:
+        rules = HouseRules()
+    if rules.continuous_reshuffle or rules.infinite_deck:
+        raise ValueError("Common random numbers need a finite shoe")
+
+    rngs = spawn_rngs(seed, 2 * len(players) + 1)
+    shoe_seed = rngs[0].getrandbits(64)
+    for player, rng in zip(players, rngs[1:]):
+        player.rng = rng
+
+    games = _paired_games(players, rules, base_bet, shoe_seed, Shoe)
+    if antithetic:
+        # Partners play the swapped shoe in step with the originals, so in each
+        # round they're dealt the original dealer's opening cards and vice versa
+        partners = [copy.deepcopy(player) for player in players]
+        for partner, rng in zip(partners, rngs[1 + len(players):]):
+            partner.rng = rng
+        games += _paired_games(partners, rules, base_bet, shoe_seed, SwappedShoe)
+    profits = np.zeros((len(games), num_hands))
+
+    bankrolls = [player.bankroll for player in players]
+    for hand in range(num_hands):
+        _play_in_step(games, profits, hand)
+    for player, bankroll in zip(players, bankrolls):
+        player.bankroll = bankroll
+
+    if antithetic:
+        profits = (profits[:len(players)] + profits[len(players):]) / 2
+
+    units = profits / base_bet
+    hands = num_hands
+    means = units.mean(axis=1)
+    variances = units.var(axis=1, ddof=1) if hands > 1 else np.zeros(len(players))
+
+    results = []
+    for i, player in enumerate(players):
+        diff = units[i] - units[baseline]
+        diff_se = float(diff.std(ddof=1) / hands ** 0.5) if hands > 1 else 0.0
+        # What the difference's standard error would be with independent shoes
+        independent_se = float(((variances[i] + variances[baseline]) / hands) ** 0.5)
+        results.append({
+            "player": repr(player),
+            "hands": hands,
+            "simulated_hands": hands * (2 if antithetic else 1),
+            "ev_per_unit": float(means[i]),
+            "ev_se": float((variances[i] / hands) ** 0.5),
+            "diff_vs_baseline": float(diff.mean()),
+            "diff_se": diff_se,
+            "independent_diff_se": independent_se,
+            "variance_reduction": independent_se ** 2 / diff_se ** 2 if diff_se > 0 else float("nan"),
+        })
+    return results
@@ -0,0 +1,116 @@
+from typing import Iterable, Optional
+import numpy as np
+from .card import CODE_RANKS, NUM_CODES, RANKS, SUITS
+from .events import CardDealtEvent, GameEvent, ShoeReshuffledEvent
+
+# Tags per rank index: A, 2, 3, 4, 5, 6, 7, 8, 9, 10, J, Q, K
+COUNT_SYSTEMS: dict[str, tuple[float, ...]] = {
+    "Hi-Lo": (-1, 1, 1, 1, 1, 1, 0, 0, 0, -1, -1, -1, -1),
+    "KO": (-1, 1, 1, 1, 1, 1, 1, 0, 0, -1, -1, -1, -1),
+    "Hi-Opt I": (0, 0, 1, 1, 1, 1, 0, 0, 0, -1, -1, -1, -1),
+    "Hi-Opt II": (0, 1, 1, 2, 2, 1, 1, 0, 0, -2, -2, -2, -2),
+    "Omega II": (0, 1, 1, 2, 2, 2, 1, 0, -1, -2, -2, -2, -2),
+    "Zen": (-1, 1, 1, 2, 2, 2, 1, 0, 0, -2, -2, -2, -2),
+    "Wong Halves": (-1, 0.5, 1, 1, 1.5, 1, 0.5, 0, -0.5, -1, -1, -1, -1),
+    "Red Seven": (-1, 1, 1, 1, 1, 1, 0, 0, 0, -1, -1, -1, -1),
+    "Uston APC": (0, 1, 2, 2, 3, 2, 2, 1, -1, -3, -3, -3, -3),
+    "Uston SS": (-2, 2, 2, 2, 3, 2, 1, 0, -1, -2, -2, -2, -2),
+}
+SYSTEM_NAMES = tuple(COUNT_SYSTEMS)
+
+RED_SUITS = ("♥", "♦")
+SEVEN_RANK = RANKS.index("7")
+
+
+def _tag_matrix() -> np.ndarray:
+    matrix = np.array([[COUNT_SYSTEMS[name][rank] for name in SYSTEM_NAMES] for rank in CODE_RANKS])
+    # Red Seven counts only the red sevens
+    red_seven = SYSTEM_NAMES.index("Red Seven")
+    for code in range(NUM_CODES):
+        if CODE_RANKS[code] == SEVEN_RANK and SUITS[code // len(RANKS)] in RED_SUITS:
+            matrix[code, red_seven] = 1
+    return matrix
+
+
+# Rows are card codes and columns are systems, so every count is seen @ TAG_MATRIX
+TAG_MATRIX = _tag_matrix()
+
+# A balanced count sums to zero over a full deck; only those convert to a true count
+BALANCED_SYSTEMS = tuple(
+    name for name, total in zip(SYSTEM_NAMES, TAG_MATRIX.sum(axis=0)) if total == 0
+)
+# Unbalanced counts start at per_deck * decks + offset instead, so their
+# running count is bet on directly
+INITIAL_COUNTS: dict[str, tuple[int, int]] = {
+    "KO": (-4, 4),
+    "Red Seven": (-2, 0),
+    "Uston SS": (-2, 0),
+}
+
+
+def initial_running_count(system: str, num_decks: int) -> float:
+    per_deck, offset = INITIAL_COUNTS.get(system, (0, 0))
+    return per_deck * num_decks + offset
+
+
+class CardCounter:
+    subscribed_events = (CardDealtEvent, ShoeReshuffledEvent)
+
+    def __init__(self, systems: Optional[Iterable[str]] = None, num_decks: int = 6):
+        self.systems = tuple(systems) if systems is not None else SYSTEM_NAMES
+        self.tags = TAG_MATRIX[:, [SYSTEM_NAMES.index(name) for name in self.systems]]
+        self.set_num_decks(num_decks)
+        self.seen = [0] * NUM_CODES
+        self.cards_seen = 0
+
+    def on_event(self, event: GameEvent) -> None:
+        if isinstance(event, CardDealtEvent):
+            self.see(event.card.code)
+        elif isinstance(event, ShoeReshuffledEvent):
+            self.set_num_decks(event.num_decks)
+            self.reset()
+
+    def set_num_decks(self, num_decks: int) -> None:
+        # Only the unbalanced counts' starting points depend on the shoe size
+        self.num_decks = num_decks
+        self.initial = np.array([initial_running_count(name, num_decks) for name in self.systems])
+        self._counts: Optional[np.ndarray] = None
+
+    def see(self, code: int) -> None:
+        self.seen[code] += 1
+        self.cards_seen += 1
+        self._counts = None
+
+    def reset(self) -> None:
+        self.seen = [0] * NUM_CODES
+        self.cards_seen = 0
+        self._counts = None
+
+    def _running(self) -> np.ndarray:
+        # Counts are only recomputed when read after new cards were seen
+        if self._counts is None:
+            self._counts = self.initial + np.asarray(self.seen) @ self.tags
+        return self._counts
+
+    def counts(self) -> np.ndarray:
+        # Running counts in self.systems order
+        return self._running()
+
+    def running_count(self, system: str) -> float:
+        return float(self._running()[self.systems.index(system)])
+
+    def true_count(self, system: str, cards_remaining: int) -> float:
+        if system not in BALANCED_SYSTEMS:
+            raise ValueError(f"{system} is an unbalanced count and has no true count")
+        return self.running_count(system) / max(cards_remaining / 52, 1)
+
+    def running_counts(self) -> dict[str, float]:
+        return dict(zip(self.systems, self._running().tolist()))
+
+    def true_counts(self, cards_remaining: int) -> dict[str, float]:
+        decks_remaining = max(cards_remaining / 52, 1)
+        return {
+            name: count / decks_remaining
+            for name, count in self.running_counts().items()
+            if name in BALANCED_SYSTEMS
+        }
@@ -0,0 +1,173 @@
+from typing import Iterable, Optional
+from functools import lru_cache
+from .card import Card, CODE_VALUE_INDEX
+from .hand import Hand
+from .rules import HouseRules
+
+# Compositions are tuples of card counts per value index (0-8 for 2-10, 9 for the ace)
+Composition = tuple[int, ...]
+
+ACE_INDEX = 9
+INDEX_LOW_VALUES = (2, 3, 4, 5, 6, 7, 8, 9, 10, 1)
+DEALER_OUTCOMES = (17, 18, 19, 20, 21, "bust", "blackjack")
+_BUST = 5
+_BLACKJACK = 6
+
+
+def shoe_composition(num_decks: int) -> Composition:
+    counts = [0] * len(INDEX_LOW_VALUES)
+    for value_index in CODE_VALUE_INDEX:
+        counts[value_index] += num_decks
+    return tuple(counts)
+
+
+def remove_cards(composition: Composition, codes: Iterable[int]) -> Composition:
+    counts = list(composition)
+    for code in codes:
+        counts[CODE_VALUE_INDEX[code]] -= 1
+    return tuple(counts)
+
+
+def _best_total(hard: int, has_ace: bool) -> int:
+    return hard + 10 if has_ace and hard <= 11 else hard
+
+
+@lru_cache(maxsize=1_000_000)
+def _dealer_outcomes(
+    composition: Composition, hard: int, has_ace: bool, num_cards: int, hits_soft_17: bool
+) -> tuple[float, ...]:
+    best = _best_total(hard, has_ace)
+    outcome = [0.0] * len(DEALER_OUTCOMES)
+    if num_cards == 2 and best == 21:
+        outcome[_BLACKJACK] = 1.0
+        return tuple(outcome)
+    if hard > 21:
+        outcome[_BUST] = 1.0
+        return tuple(outcome)
+    soft = has_ace and hard <= 11
+    if num_cards >= 2 and (best > 17 or (best == 17 and not (soft and hits_soft_17))):
+        outcome[best - 17] = 1.0
+        return tuple(outcome)
+
+    remaining = sum(composition)
+    counts = list(composition)
+    for index, count in enumerate(composition):
+        if count == 0:
+            continue
+        counts[index] -= 1
+        drawn = _dealer_outcomes(
+            tuple(counts),
+            hard + INDEX_LOW_VALUES[index],
+            has_ace or index == ACE_INDEX,
+            min(num_cards + 1, 3),
+            hits_soft_17,
+        )
+        counts[index] += 1
+        weight = count / remaining
+        for i, p in enumerate(drawn):
+            outcome[i] += weight * p
+    return tuple(outcome)
+
+
+def dealer_distribution(
+    composition: Composition, upcard: int, rules: HouseRules
+) -> dict[object, float]:
+    outcome = _dealer_outcomes(
+        composition,
+        INDEX_LOW_VALUES[upcard],
+        upcard == ACE_INDEX,
+        1,
+        rules.dealer_hits_soft_17,
+    )
+    return dict(zip(DEALER_OUTCOMES, outcome))
+
+
+def _stand_ev(composition: Composition, total: int, upcard: int, hits_soft_17: bool) -> float:
+    outcome = _dealer_outcomes(
+        composition, INDEX_LOW_VALUES[upcard], upcard == ACE_INDEX, 1, hits_soft_17
+    )
+    ev = outcome[_BUST] - outcome[_BLACKJACK]
+    for i, p in enumerate(outcome[:_BUST]):
+        dealer_total = 17 + i
+        if total > dealer_total:
+            ev += p
+        elif total < dealer_total:
+            ev -= p
+    return ev
+
+
+@lru_cache(maxsize=1_000_000)
+def _play_ev(
+    composition: Composition, hard: int, has_ace: bool, upcard: int, hits_soft_17: bool
+) -> float:
+    stand = _stand_ev(composition, _best_total(hard, has_ace), upcard, hits_soft_17)
+    return max(stand, _hit_ev(composition, hard, has_ace, upcard, hits_soft_17))
+
+
+def _hit_ev(
+    composition: Composition, hard: int, has_ace: bool, upcard: int, hits_soft_17: bool
+) -> float:
+    remaining = sum(composition)
+    counts = list(composition)
+    ev = 0.0
+    for index, count in enumerate(composition):
+        if count == 0:
+            continue
+        new_hard = hard + INDEX_LOW_VALUES[index]
+        if new_hard > 21:
+            ev -= count / remaining
+            continue
+        counts[index] -= 1
+        ev += count / remaining * _play_ev(
+            tuple(counts), new_hard, has_ace or index == ACE_INDEX, upcard, hits_soft_17
+        )
+        counts[index] += 1
+    return ev
+
+
+def _double_ev(
+    composition: Composition, hard: int, has_ace: bool, upcard: int, hits_soft_17: bool
+) -> float:
+    remaining = sum(composition)
+    counts = list(composition)
+    ev = 0.0
+    for index, count in enumerate(composition):
+        if count == 0:
+            continue
+        new_hard = hard + INDEX_LOW_VALUES[index]
+        if new_hard > 21:
+            ev -= count / remaining
+            continue
+        counts[index] -= 1
+        total = _best_total(new_hard, has_ace or index == ACE_INDEX)
+        ev += count / remaining * _stand_ev(tuple(counts), total, upcard, hits_soft_17)
+        counts[index] += 1
+    return 2 * ev
+
+
+def action_evs(
+    hand: Hand,
+    dealer_up: Card,
+    rules: HouseRules,
+    composition: Optional[Composition] = None,
+) -> dict[str, float]:
+    # Exact hit EVs run the dealer recursion for every composition the player's
+    # hits can reach: a cold call for a low hard total takes a couple of seconds,
+    # repeated calls with a warm cache take well under a millisecond
+    if composition is None:
+        composition = remove_cards(shoe_composition(rules.num_decks), hand.codes + [dealer_up.code])
+
+    upcard = dealer_up.value_index
+    has_ace = hand.aces > 0
+    hits_soft_17 = rules.dealer_hits_soft_17
+    return {
+        "stand": _stand_ev(composition, hand.best_total, upcard, hits_soft_17),
+        "hit": _hit_ev(composition, hand.hard_total, has_ace, upcard, hits_soft_17),
+        "double": _double_ev(composition, hand.hard_total, has_ace, upcard, hits_soft_17),
+        "surrender": -0.5,
+    }
+
+
+def clear_cache() -> None:
+    _dealer_outcomes.cache_clear()
+    _play_ev.cache_clear()
@@ -0,0 +1,58 @@
+from typing import Literal, Optional, Protocol
+from dataclasses import dataclass
+from .card import Card
+from .hand import Hand
+
+
+@dataclass
+class GameEvent:
+    pass
+
+
+@dataclass
+class CardDealtEvent(GameEvent):
+    card: Card
+    recipient: Literal["player", "dealer"]
+
+
+@dataclass
+class ShoeReshuffledEvent(GameEvent):
+    num_decks: int
+
+
+@dataclass
+class DoubleDownEvent(GameEvent):
+    original_bet: int
+    new_bet: int
+
+
+@dataclass
+class RoundEndEvent(GameEvent):
+    outcome: Literal["win", "loss", "push", "blackjack", "surr_loss", "broke"]
+    player_hand: Optional[Hand]
+    dealer_hand: Optional[Hand]
+    bankroll: float
+
+
+@dataclass
+class RoundRecord(GameEvent):
+    player_cards: bytes
+    dealer_cards: bytes
+    bet: int
+    outcome: Literal["win", "loss", "push", "blackjack", "surr_loss", "broke"]
+    bankroll: float
+    reshuffled: bool
+    # The player asked to double, even if the bankroll couldn't cover it
+    doubled: bool = False
+    player_total: int = 0
+    dealer_total: int = 0
+
+
+# Observers that don't declare subscribed_events receive every per-event type
+DEFAULT_EVENTS = (CardDealtEvent, ShoeReshuffledEvent, DoubleDownEvent, RoundEndEvent)
+EVENT_TYPES = DEFAULT_EVENTS + (RoundRecord,)
+
+
+class GameObserver(Protocol):
+    def on_event(self, event: GameEvent) -> None:
+        ...
@@ -1,74 +1,176 @@
-from typing import Literal, Union, Optional, Protocol
-from dataclasses import dataclass
-from .card import build_shoe, Card
+from typing import Callable, Iterable, Literal, Union, Optional
+import random
+from .card import CARDS
+from .events import (
+    GameEvent,
+    CardDealtEvent,
+    ShoeReshuffledEvent,
+    DoubleDownEvent,
+    RoundEndEvent,
+    RoundRecord,
+    GameObserver,
+    DEFAULT_EVENTS,
+    EVENT_TYPES,
+)
 from .hand import Hand
 from .players.base import Player
+from .profiling import GAME_PHASES, PhaseProfiler, TimedObserver
+from .shoe import Shoe, make_shoe
 from .rules import HouseRules
 
+Outcome = Literal["win", "loss", "push", "blackjack", "surr_loss", "broke"]
+
+
+# Round logic shared by Game and Table; the callers deal cards and notify
+# observers, these only decide what happens
+def natural_outcome(player_hand: Hand, dealer_hand: Hand) -> Optional[Outcome]:
+    if player_hand.is_blackjack:
+        return "push" if dealer_hand.is_blackjack else "blackjack"
+    return None
+
+
+def play_player_hand(
+    player: Player,
+    player_hand: Hand,
+    dealer_hand: Hand,
+    rules: HouseRules,
+    deal: Callable[[Hand, Literal["player", "dealer"]], None],
+    double: Callable[[], None],
+) -> Optional[Outcome]:
+    dealer_up = CARDS[dealer_hand.codes[0]]
+    while not player_hand.is_bust:
+        move = player.decide_move(player_hand, dealer_up, rules)
+
+        if move == "hit":
+            deal(player_hand, "player")
+        elif move == "surrender":
+            return "surr_loss"
+        elif move == "double":
+            # The caller doubles the bet if it can; either way the hand takes exactly one card
+            double()
+            deal(player_hand, "player")
+            break
+        else:
+            break
 
-@dataclass
-class GameEvent:
-    pass
-
-
-@dataclass
-class CardDealtEvent(GameEvent):
-    card: Card
-    recipient: Literal["player", "dealer"]
-
-
-@dataclass
-class ShoeReshuffledEvent(GameEvent):
-    num_decks: int
+    if player_hand.is_bust:
+        return "loss"
+    return None
 
 
-@dataclass
-class DoubleDownEvent(GameEvent):
-    original_bet: int
-    new_bet: int
+def dealer_should_hit(dealer_hand: Hand, rules: HouseRules) -> bool:
+    total = dealer_hand.best_total
+    return total < 17 or (total == 17 and dealer_hand.is_soft and rules.dealer_hits_soft_17)
 
 
-@dataclass
-class RoundEndEvent(GameEvent):
-    outcome: Literal["win", "loss", "push", "blackjack", "surr_loss", "broke"]
-    player_hand: Optional[Hand]
-    dealer_hand: Optional[Hand]
-    bankroll: float
+def showdown(player_hand: Hand, dealer_hand: Hand) -> Outcome:
+    if dealer_hand.is_blackjack:
+        return "loss"
+    if dealer_hand.is_bust or player_hand.best_total > dealer_hand.best_total:
+        return "win"
+    if player_hand.best_total < dealer_hand.best_total:
+        return "loss"
+    return "push"
 
 
-class GameObserver(Protocol):
-    def on_event(self, event: GameEvent) -> None:
-        ...
+def settlement(result: Outcome, bet: float, rules: HouseRules) -> float:
+    if result == "loss":
+        return -bet
+    elif result == "win":
+        return bet
+    elif result == "blackjack":
+        return bet * rules.blackjack_payout
+    elif result == "surr_loss":
+        return -bet * 0.5
+    return 0
 
 
 class Game:
-    def __init__(self, rules: HouseRules, player: Player, bet: int):
+    def __init__(
+        self,
+        rules: HouseRules,
+        player: Player,
+        bet: int,
+        rng: Optional[random.Random] = None,
+        profile: bool = False,
+        shoe: Optional[Shoe] = None,
+    ):
         self.rules: HouseRules = rules
         self.player: Player = player
-        self.shoe: list[Card] = build_shoe(num_decks=self.rules.num_decks)
+        self.rng: random.Random = rng if rng is not None else random.Random()
+        self.shoe: Shoe = shoe if shoe is not None else make_shoe(self.rules, self.rng)
         self.base_bet: int = bet
         self.bet: int = bet
         self.observers: list[GameObserver] = []
-
-    def add_observer(self, observer: GameObserver) -> None:
+        self._subscriptions: list[tuple[GameObserver, tuple[type[GameEvent], ...]]] = []
+        self._dispatch: dict[type[GameEvent], list[GameObserver]] = {}
+        self._round_hands: Optional[tuple[Hand, Hand]] = None
+        self._reshuffled: bool = False
+        self._doubled: bool = False
+        self.profiler: Optional[PhaseProfiler] = None
+        if profile:
+            # Timing wrappers are installed on this instance only, so an
+            # unprofiled game runs the plain methods
+            self.profiler = PhaseProfiler()
+            for phase in GAME_PHASES:
+                setattr(self, phase, self.profiler.wrap(phase, getattr(self, phase)))
+        self._rebuild_dispatch()
+
+    def add_observer(
+        self, observer: GameObserver, events: Optional[Iterable[type[GameEvent]]] = None
+    ) -> None:
+        if events is None:
+            events = getattr(observer, "subscribed_events", DEFAULT_EVENTS)
         self.observers.append(observer)
+        self._subscriptions.append((observer, tuple(events)))
+        self._rebuild_dispatch()
 
     def remove_observer(self, observer: GameObserver) -> None:
         self.observers.remove(observer)
+        self._subscriptions = [(obs, events) for obs, events in self._subscriptions if obs is not observer]
+        self._rebuild_dispatch()
+
+    def _rebuild_dispatch(self) -> None:
+        targets = [
+            (TimedObserver(obs, self.profiler) if self.profiler else obs, events)
+            for obs, events in self._subscriptions
+        ]
+        self._dispatch = {
+            event_type: [obs for obs, events in targets if issubclass(event_type, events)]
+            for event_type in EVENT_TYPES
+        }
+
+    def _observers_for(self, event_type: type[GameEvent]) -> list[GameObserver]:
+        # Event types outside EVENT_TYPES, such as subclasses of the built-in
+        # events, get their list the first time one is sent. Observers on the
+        # default subscription also receive event types that aren't built in
+        observers = self._dispatch.get(event_type)
+        if observers is None:
+            custom = not issubclass(event_type, EVENT_TYPES)
+            observers = [
+                TimedObserver(obs, self.profiler) if self.profiler else obs
+                for obs, events in self._subscriptions
+                if issubclass(event_type, events) or (custom and events == DEFAULT_EVENTS)
+            ]
+            self._dispatch[event_type] = observers
+        return observers
 
     def _notify(self, event: GameEvent) -> None:
-        for observer in self.observers:
+        for observer in self._observers_for(type(event)):
             observer.on_event(event)
 
     def _deal_card(self, hand: Hand, recipient: Literal["player", "dealer"]) -> None:
-        card = self.shoe.pop()
-        hand.add(card)
-        self._notify(CardDealtEvent(card=card, recipient=recipient))
+        code = self.shoe.draw()
+        hand.add_code(code)
+        if self._dispatch[CardDealtEvent]:
+            self._notify(CardDealtEvent(card=CARDS[code], recipient=recipient))
 
     def _check_reshuffle(self) -> None:
-        if len(self.shoe) / (self.rules.num_decks * 52) <= self.rules.reshuffle_threshold:
-            self.shoe = build_shoe(num_decks=self.rules.num_decks)
-            self._notify(ShoeReshuffledEvent(num_decks=self.rules.num_decks))
+        if self.shoe.needs_reshuffle:
+            self.shoe.shuffle()
+            self._reshuffled = True
+            if self._dispatch[ShoeReshuffledEvent]:
+                self._notify(ShoeReshuffledEvent(num_decks=self.rules.num_decks))
 
     def _check_bankrupcy(self) -> Optional[dict[str, Union[str, Hand, None, float]]]:
         if self.player.bankroll < self.bet:
@@ -84,84 +186,64 @@ class Game:
         self._deal_card(dealer_hand, "dealer")
         return (player_hand, dealer_hand)
 
+    def _double_down(self) -> None:
+        self._doubled = True
+        if self.player.bankroll < self.bet * 2:
+            return
+        original_bet = self.bet
+        self.bet *= 2
+        if self._dispatch[DoubleDownEvent]:
+            self._notify(DoubleDownEvent(original_bet=original_bet, new_bet=self.bet))
+
     def _player_turn(self, player_hand: Hand, dealer_hand: Hand) -> Optional[dict[str, Union[str, Hand, None, float]]]:
-        if player_hand.is_blackjack and dealer_hand.is_blackjack:
-            return self._round_result("push", player_hand, dealer_hand)
-        elif player_hand.is_blackjack:
-            return self._round_result("blackjack", player_hand, dealer_hand)
-        
-        while not player_hand.is_bust:
-            move = self.player.decide_move(player_hand, dealer_hand.cards[0], self.rules)
-            
-            if move == "hit":
-                self._deal_card(player_hand, "player")
-            elif move == "surrender":
-                return self._round_result("surr_loss", None, None)
-            elif move == "double":
-                if self.player.bankroll >= self.bet * 2:
-                    original_bet = self.bet
-                    self.bet *= 2
-                    self._notify(DoubleDownEvent(original_bet=original_bet, new_bet=self.bet))
-                    self._deal_card(player_hand, "player")
-                    break
-                else:
-                    self._deal_card(player_hand, "player")
-                    break
-            elif move == "stand":
-                break
-            else:
-                break
-
-        if player_hand.is_bust:
-            return self._round_result("loss", player_hand, dealer_hand)
+        result = natural_outcome(player_hand, dealer_hand)
+        if result is None:
+            result = play_player_hand(
+                self.player,
+                player_hand,
+                dealer_hand,
+                self.rules,
+                self._deal_card,
+                self._double_down,
+            )
+        if result == "surr_loss":
+            return self._round_result(result, None, None)
+        if result:
+            return self._round_result(result, player_hand, dealer_hand)
         return None
 
     def _dealer_turn(self, player_hand: Hand, dealer_hand: Hand) -> Optional[dict[str, Union[str, Hand, None, float]]]:
         if dealer_hand.is_blackjack:
             return self._round_result("loss", player_hand, dealer_hand)
-        
-        while True:
-            total = dealer_hand.best_total
-            should_hit = total < 17 or (total == 17 and dealer_hand.is_soft and self.rules.dealer_hits_soft_17)
-            if should_hit:
-                self._deal_card(dealer_hand, "dealer")
-            else:
-                break
+
+        while dealer_should_hit(dealer_hand, self.rules):
+            self._deal_card(dealer_hand, "dealer")
 
         if dealer_hand.is_bust:
             return self._round_result("win", player_hand, dealer_hand)
         return None
 
     def _compare_hands(self, player_hand: Hand, dealer_hand: Hand) -> dict[str, Union[str, Hand, None, float]]:
-        if player_hand.best_total > dealer_hand.best_total:
-            return self._round_result("win", player_hand, dealer_hand)
-        elif player_hand.best_total < dealer_hand.best_total:
-            return self._round_result("loss", player_hand, dealer_hand)
-        else:
-            return self._round_result("push", player_hand, dealer_hand)
+        return self._round_result(showdown(player_hand, dealer_hand), player_hand, dealer_hand)
 
     def _round_result(
         self,
-        result: Literal["win", "loss", "push", "blackjack", "surr_loss", "broke"],
+        result: Outcome,
         player_hand: Optional[Hand],
         dealer_hand: Optional[Hand],
     ) -> dict[str, Union[str, Hand, None, float]]:
-        if result == "loss":
-            self.player.bankroll -= self.bet
-        elif result == "win":
-            self.player.bankroll += self.bet
-        elif result == "blackjack":
-            self.player.bankroll += self.bet * self.rules.blackjack_payout
-        elif result == "surr_loss":
-            self.player.bankroll -= self.bet * 0.5
-        
+        self.player.bankroll += settlement(result, self.bet, self.rules)
+
+        if self._dispatch[RoundRecord]:
+            self._notify(self._round_record(result))
         self.bet = self.base_bet
-        self._notify(RoundEndEvent(
-            outcome=result,
-            player_hand=player_hand,
-            dealer_hand=dealer_hand,
-            bankroll=self.player.bankroll
-        ))
+        if self._dispatch[RoundEndEvent]:
+            self._notify(RoundEndEvent(
+                outcome=result,
+                player_hand=player_hand,
+                dealer_hand=dealer_hand,
+                bankroll=self.player.bankroll
+            ))
 
         return {
             "outcome": result,
@@ -170,7 +252,32 @@ class Game:
             "bankroll": self.player.bankroll,
         }
 
+    def _round_record(
+        self, result: Outcome
+    ) -> RoundRecord:
+        if self._round_hands:
+            player_hand, dealer_hand = self._round_hands
+            player_cards, dealer_cards = bytes(player_hand.codes), bytes(dealer_hand.codes)
+            player_total, dealer_total = player_hand.best_total, dealer_hand.best_total
+        else:
+            player_cards = dealer_cards = b""
+            player_total = dealer_total = 0
+        return RoundRecord(
+            player_cards=player_cards,
+            dealer_cards=dealer_cards,
+            bet=self.bet,
+            outcome=result,
+            bankroll=self.player.bankroll,
+            reshuffled=self._reshuffled,
+            doubled=self._doubled,
+            player_total=player_total,
+            dealer_total=dealer_total,
+        )
+
     def play_round(self) -> dict[str, Union[str, Hand, None, float]]:
+        self._round_hands = None
+        self._reshuffled = False
+        self._doubled = False
         self._check_reshuffle()
         self.bet = self.player.decide_bet_amount(curr_bet_unit=self.base_bet, shoe_length=len(self.shoe))
 
@@ -179,6 +286,7 @@ class Game:
             return result
 
         player_hand, dealer_hand = self._deal()
+        self._round_hands = (player_hand, dealer_hand)
 
         result = self._player_turn(player_hand, dealer_hand)
         if result:
@@ -1,44 +1,56 @@
-from dataclasses import dataclass, field
-from .card import Card
+from typing import Iterable
+from .card import Card, CARDS, CODE_RANKS, CODE_VALUES, ACE_RANK
+
+# Value of each card code with aces counted as 1
+_LOW_VALUES = bytes(
+    value - 10 if rank == ACE_RANK else value for value, rank in zip(CODE_VALUES, CODE_RANKS)
+)
 
-@dataclass
 class Hand:
-    cards: list[Card] = field(default_factory=list)
+    __slots__ = ("codes", "hard_total", "aces")
+
+    def __init__(self, codes: Iterable[int] = ()) -> None:
+        self.codes: list[int] = []
+        self.hard_total: int = 0
+        self.aces: int = 0
+        for code in codes:
+            self.add_code(code)
 
     def add(self, card: Card) -> None:
-        self.cards.append(card)
+        self.add_code(card.code)
+
+    def add_code(self, code: int) -> None:
+        self.codes.append(code)
+        self.hard_total += _LOW_VALUES[code]
+        if CODE_RANKS[code] == ACE_RANK:
+            self.aces += 1
+
+    @property
+    def cards(self) -> list[Card]:
+        return [CARDS[code] for code in self.codes]
 
     def totals(self) -> list[int]:
-        total, aces = 0, 0
-        for card in self.cards:
-            total += card.hard_value
-            if card.rank == "A":
-                aces += 1
-        totals = [total]
-        for _ in range(aces):
-            totals.append(totals[-1] - 10)
-        return sorted(set(t for t in totals if t > 0), reverse=True)
+        if not self.codes:
+            return []
+        return [self.hard_total + 10 * aces for aces in range(self.aces, -1, -1)]
 
     @property
     def best_total(self) -> int:
-        for total in self.totals():
-            if total <= 21:
-                return total
-        return self.totals()[-1] if self.cards else 0
+        if self.aces and self.hard_total <= 11:
+            return self.hard_total + 10
+        return self.hard_total
 
     @property
     def is_blackjack(self) -> bool:
-        return len(self.cards) == 2 and self.totals() == [21]
+        return self.aces > 0 and self.hard_total == 11 and len(self.codes) == 2
 
     @property
     def is_bust(self) -> bool:
-        return self.best_total > 21
+        return self.hard_total > 21
 
     @property
     def is_soft(self) -> bool:
-        if not any(card.rank == "A" for card in self.cards):
-            return False
-        return self.best_total < 21 and len(self.totals()) > 1
+        return self.aces > 0 and self.hard_total <= 10
 
     def __repr__(self) -> str:
         return f"Hand: {' '.join(str(card) for card in self.cards)} \nTotal: {self.best_total} "
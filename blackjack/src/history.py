@@ -0,0 +1,225 @@
+from typing import Iterable, Iterator, Optional
+import json
+import os
+import struct
+from .card import CARDS
+from .events import (
+    CardDealtEvent,
+    DoubleDownEvent,
+    GameEvent,
+    GameObserver,
+    RoundEndEvent,
+    ShoeReshuffledEvent,
+)
+from .game import Game
+from .hand import Hand
+from .players.base import Player
+from .rules import HouseRules
+from .shoe import ContinuousShoe, InfiniteShoe, ReplayExhausted, ReplayShoe, Shoe
+
+# Layout: magic, version, header length, JSON header, then a stream of
+# records that each start with a one-byte tag
+MAGIC = b"BJEVENT\x00"
+FORMAT_VERSION = 1
+_PREFIX = struct.Struct("<8sII")
+
+HISTORY_EXTENSION = ".events"
+OUTCOMES = ("win", "loss", "push", "blackjack", "surr_loss", "broke")
+
+PLAYER_CARD = 0
+DEALER_CARD = 1
+DOUBLE_DOWN = 2
+RESHUFFLE = 3
+ROUND_END = 4
+SHOE_ORDER = 5
+
+_CARD = struct.Struct("<BB")
+_DOUBLE = struct.Struct("<Bdd")
+_RESHUFFLE = struct.Struct("<BH")
+_ROUND_END = struct.Struct("<BBd")
+_SHOE = struct.Struct("<BH")
+# Set on the outcome byte when the round ended without hands (broke, surrender)
+_NO_HANDS = 0x80
+
+
+class EventRecorder:
+    subscribed_events = (CardDealtEvent, DoubleDownEvent, ShoeReshuffledEvent, RoundEndEvent)
+
+    def __init__(self, filepath: str, shoe: Optional[Shoe] = None, buffer_bytes: int = 1 << 20):
+        # With the game's shoe the full order of every shoe is written after
+        # each reshuffle, so a replay deals exactly the same shoes to a player
+        # who takes a different number of cards. Shuffling machines and infinite
+        # decks have no fixed order and only record the cards that were dealt
+        if isinstance(shoe, (ContinuousShoe, InfiniteShoe)):
+            shoe = None
+        self.filepath = filepath
+        self.shoe = shoe
+        self.buffer_bytes = buffer_bytes
+        self._buffer = bytearray()
+
+        header = {"shoe_orders": shoe is not None, "num_decks": shoe.num_decks if shoe else None}
+        encoded = json.dumps(header).encode()
+        directory = os.path.dirname(filepath)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(filepath, "wb")
+        self._file.write(_PREFIX.pack(MAGIC, FORMAT_VERSION, len(encoded)))
+        self._file.write(encoded)
+        if shoe is not None:
+            self._write_shoe()
+
+    def __enter__(self) -> "EventRecorder":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _write_shoe(self) -> None:
+        order = self.shoe.remaining_codes()
+        self._buffer += _SHOE.pack(SHOE_ORDER, len(order))
+        self._buffer += order
+
+    def on_event(self, event: GameEvent) -> None:
+        event_type = type(event)
+        if event_type is CardDealtEvent:
+            self._buffer += _CARD.pack(PLAYER_CARD if event.recipient == "player" else DEALER_CARD, event.card.code)
+        elif event_type is RoundEndEvent:
+            outcome = OUTCOMES.index(event.outcome)
+            if event.player_hand is None:
+                outcome |= _NO_HANDS
+            self._buffer += _ROUND_END.pack(ROUND_END, outcome, event.bankroll)
+            if len(self._buffer) >= self.buffer_bytes:
+                self.flush()
+        elif event_type is DoubleDownEvent:
+            self._buffer += _DOUBLE.pack(DOUBLE_DOWN, event.original_bet, event.new_bet)
+        elif event_type is ShoeReshuffledEvent:
+            self._buffer += _RESHUFFLE.pack(RESHUFFLE, event.num_decks)
+            if self.shoe is not None:
+                self._write_shoe()
+
+    def flush(self) -> None:
+        if self._buffer:
+            self._file.write(self._buffer)
+            self._buffer = bytearray()
+        self._file.flush()
+
+    def close(self) -> None:
+        if not self._file.closed:
+            self.flush()
+            self._file.close()
+
+
+def _read(filepath: str) -> tuple[dict, bytes]:
+    with open(filepath, "rb") as f:
+        magic, version, header_length = _PREFIX.unpack(f.read(_PREFIX.size))
+        if magic != MAGIC:
+            raise ValueError(f"{filepath} is not an event history")
+        if version != FORMAT_VERSION:
+            raise ValueError(f"Unsupported event history version {version} in {filepath}")
+        header = json.loads(f.read(header_length))
+        return header, f.read()
+
+
+def _records(data: bytes) -> Iterator[tuple]:
+    offset = 0
+    end = len(data)
+    while offset < end:
+        tag = data[offset]
+        if tag <= DEALER_CARD:
+            yield _CARD.unpack_from(data, offset)
+            offset += _CARD.size
+        elif tag == ROUND_END:
+            yield _ROUND_END.unpack_from(data, offset)
+            offset += _ROUND_END.size
+        elif tag == DOUBLE_DOWN:
+            yield _DOUBLE.unpack_from(data, offset)
+            offset += _DOUBLE.size
+        elif tag == RESHUFFLE:
+            yield _RESHUFFLE.unpack_from(data, offset)
+            offset += _RESHUFFLE.size
+        elif tag == SHOE_ORDER:
+            _, length = _SHOE.unpack_from(data, offset)
+            offset += _SHOE.size
+            yield (SHOE_ORDER, data[offset:offset + length])
+            offset += length
+        else:
+            raise ValueError(f"Unknown record tag {tag} at byte {offset}")
+
+
+def read_events(filepath: str) -> Iterator[GameEvent]:
+    _, data = _read(filepath)
+    player_hand, dealer_hand = Hand(), Hand()
+    for record in _records(data):
+        tag = record[0]
+        if tag <= DEALER_CARD:
+            (player_hand if tag == PLAYER_CARD else dealer_hand).add_code(record[1])
+            yield CardDealtEvent(card=CARDS[record[1]], recipient="player" if tag == PLAYER_CARD else "dealer")
+        elif tag == ROUND_END:
+            has_hands = not record[1] & _NO_HANDS
+            yield RoundEndEvent(
+                outcome=OUTCOMES[record[1] & ~_NO_HANDS],
+                player_hand=player_hand if has_hands else None,
+                dealer_hand=dealer_hand if has_hands else None,
+                bankroll=record[2],
+            )
+            player_hand, dealer_hand = Hand(), Hand()
+        elif tag == DOUBLE_DOWN:
+            yield DoubleDownEvent(original_bet=record[1], new_bet=record[2])
+        elif tag == RESHUFFLE:
+            yield ShoeReshuffledEvent(num_decks=record[1])
+
+
+def read_shoes(filepath: str) -> tuple[list[bytes], Optional[int]]:
+    # Returns the recorded shoe orders with their deck count, or the dealt
+    # cards split at each reshuffle and None when the history has no shoe orders
+    header, data = _read(filepath)
+    if header["shoe_orders"]:
+        return [record[1] for record in _records(data) if record[0] == SHOE_ORDER], header["num_decks"]
+
+    shoes = []
+    dealt = bytearray()
+    for record in _records(data):
+        if record[0] <= DEALER_CARD:
+            dealt.append(record[1])
+        elif record[0] == RESHUFFLE and dealt:
+            shoes.append(bytes(dealt))
+            dealt = bytearray()
+    if dealt:
+        shoes.append(bytes(dealt))
+    return shoes, None
+
+
+def replay(
+    filepath: str,
+    player: Player,
+    rules: HouseRules = None,
+    base_bet: int = 5,
+    observers: Iterable[GameObserver] = (),
+    max_rounds: Optional[int] = None,
+) -> int:
+    if rules is None:
+        rules = HouseRules()
+    shoes, num_decks = read_shoes(filepath)
+
+    # A stream of dealt cards is played straight through; only full shoes keep
+    # the rules' reshuffle point
+    if num_decks is None:
+        shoe = ReplayShoe(shoes)
+    else:
+        shoe = ReplayShoe(shoes, rules.reshuffle_threshold, num_decks)
+    game = Game(rules=rules, player=player, bet=base_bet, shoe=shoe)
+    if hasattr(player, "on_event"):
+        game.add_observer(player)
+    for observer in observers:
+        game.add_observer(observer)
+
+    # Bankrolls only change when a round is settled, so a round cut short by
+    # the end of the history leaves the player as it was
+    rounds = 0
+    try:
+        while max_rounds is None or rounds < max_rounds:
+            game.play_round()
+            rounds += 1
+    except ReplayExhausted:
+        pass
+    return rounds
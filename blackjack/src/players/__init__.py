@@ -1,5 +1,5 @@
 from .base import Player
 from .basic import RandomStrategyPlayer, BasicStrategyPlayer
-from .counting import RCHighLowPlayer
-from .chart import ChartPlayer1, ChartPlayer2
+from .counting import RCHighLowPlayer, CountingPlayer
+from .chart import ChartPlayer1, ChartPlayer2, RuleChartPlayer
 from .learning import QLearningPlayer
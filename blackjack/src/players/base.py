@@ -1,9 +1,11 @@
 from abc import ABC, abstractmethod
 from typing import Literal
+import random
 
 class Player(ABC):
     def __init__(self, bankroll: int = 1000):
         self.bankroll = bankroll
+        self.rng: random.Random = random.Random()
 
     @abstractmethod
     def decide_move(self, hand, dealer_up, rules) -> Literal[...]:
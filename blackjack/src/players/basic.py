@@ -1,5 +1,4 @@
 from typing import Literal
-import random
 from ..card import Card
 from ..hand import Hand
 from ..rules import HouseRules
@@ -13,7 +12,7 @@ class RandomStrategyPlayer(Player):
         self, hand: Hand, dealer_up: Card, rules: HouseRules
     ) -> Literal["hit", "stand", "double", "surrender"]:
         options = ["hit", "stand", "double", "surrender"]
-        return random.choice(options)
+        return self.rng.choice(options)
 
     def decide_bet_amount(self, curr_bet_unit: int, shoe_length: int) -> int:
         return curr_bet_unit
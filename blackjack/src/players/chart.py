@@ -1,44 +1,62 @@
-from typing import Literal
+from typing import Literal, Optional
 from ..card import Card
+from ..charts import load_chart
 from ..hand import Hand
 from ..rules import HouseRules
 from .base import Player
-from ..utils.player_utils import map_result_char, get_dealer_index, BASIC_MATRIX, HARD_MATRIX, SOFT_MATRIX
+from ..utils.player_utils import StrategyTable, BASIC_STRATEGY, CHART_STRATEGY
 
 class ChartPlayer1(Player):
+    def __init__(self, bankroll: int = 1000, strategy: StrategyTable = BASIC_STRATEGY):
+        super().__init__(bankroll)
+        self.strategy = strategy
+
     def __repr__(self):
         return "Chart Player 1"
 
     def decide_move(
         self, hand: Hand, dealer_up: Card, rules: HouseRules
     ) -> Literal["hit", "stand", "double", "surrender"]:
-        return map_result_char(
-            BASIC_MATRIX[hand.best_total - 4][get_dealer_index(card_val=dealer_up.rank)]
-        )
+        return self.strategy.lookup(hand, dealer_up)
 
     def decide_bet_amount(self, curr_bet_unit: int, shoe_length: int) -> int:
         return curr_bet_unit
 
 
 class ChartPlayer2(Player):
+    def __init__(self, bankroll: int = 1000, strategy: StrategyTable = CHART_STRATEGY):
+        super().__init__(bankroll)
+        self.strategy = strategy
+
     def __repr__(self):
         return "Chart Player 2"
 
     def decide_move(
         self, hand: Hand, dealer_up: Card, rules: HouseRules
     ) -> Literal["hit", "stand", "double", "surrender"]:
-        if hand.is_soft:
-            return map_result_char(
-                SOFT_MATRIX[hand.best_total - 13][
-                    get_dealer_index(card_val=dealer_up.rank)
-                ]
-            )
-        else:
-            return map_result_char(
-                HARD_MATRIX[hand.best_total - 4][
-                    get_dealer_index(card_val=dealer_up.rank)
-                ]
-            )
+        return self.strategy.lookup(hand, dealer_up)
+
+    def decide_bet_amount(self, curr_bet_unit: int, shoe_length: int) -> int:
+        return curr_bet_unit
+
+
+class RuleChartPlayer(Player):
+    def __init__(self, bankroll: int = 1000):
+        super().__init__(bankroll)
+        self.strategy: Optional[StrategyTable] = None
+        self._rules: Optional[HouseRules] = None
+
+    def __repr__(self):
+        return "Rule-Aware Chart Player"
+
+    def decide_move(
+        self, hand: Hand, dealer_up: Card, rules: HouseRules
+    ) -> Literal["hit", "stand", "double", "surrender"]:
+        # The chart generated for these rules is loaded the first time they are seen
+        if rules is not self._rules:
+            self.strategy = load_chart(rules)
+            self._rules = rules
+        return self.strategy.lookup(hand, dealer_up)
 
     def decide_bet_amount(self, curr_bet_unit: int, shoe_length: int) -> int:
         return curr_bet_unit
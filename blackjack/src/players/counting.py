@@ -1,47 +1,91 @@
-from typing import Literal, Union
-from ..card import Card
+from typing import Literal, Optional, Union
+from ..card import Card, RANKS
+from ..counting import BALANCED_SYSTEMS, SYSTEM_NAMES, TAG_MATRIX, CardCounter
+from ..events import CardDealtEvent, GameEvent, ShoeReshuffledEvent
 from ..hand import Hand
 from ..rules import HouseRules
 from .base import Player
-from ..utils.player_utils import map_result_char, get_dealer_index, HARD_MATRIX, SOFT_MATRIX
+from ..utils.player_utils import StrategyTable, CHART_STRATEGY
+
+# Hi-Lo tag of each card code
+_HI_LO = [int(tag) for tag in TAG_MATRIX[:, SYSTEM_NAMES.index("Hi-Lo")]]
 
 class RCHighLowPlayer(Player):
-    def __init__(self, bankroll=1000):
+    subscribed_events = (CardDealtEvent, ShoeReshuffledEvent)
+
+    def __init__(self, bankroll=1000, strategy: StrategyTable = CHART_STRATEGY):
         super().__init__(bankroll)
         self.running_count: int = 0
+        self.strategy = strategy
 
     def __repr__(self):
         return "Running Count High Low Player"
 
-    def _update_running_count(self, card: Union[Card, str]) -> None:
-        if isinstance(card, str):
-            rank = card
+    def _update_running_count(self, card: Union[Card, str, int]) -> None:
+        if isinstance(card, int):
+            code = card
+        elif isinstance(card, str):
+            # The first suit's codes are the rank indexes
+            code = RANKS.index(card)
         else:
-            rank = card.rank
-        if rank in ["2", "3", "4", "5", "6"]:
-            self.running_count += 1
-        elif rank in ["10", "J", "Q", "K", "A"]:
-            self.running_count -= 1
+            code = card.code
+        self.running_count += _HI_LO[code]
 
     def _reset_running_count(self):
         self.running_count = 0
 
+    def on_event(self, event: GameEvent) -> None:
+        if isinstance(event, CardDealtEvent):
+            self._update_running_count(event.card.code)
+        elif isinstance(event, ShoeReshuffledEvent):
+            self._reset_running_count()
+
     def decide_move(
         self, hand: Hand, dealer_up: Card, rules: HouseRules
     ) -> Literal["hit", "stand", "double", "surrender"]:
-        if hand.is_soft:
-            return map_result_char(
-                SOFT_MATRIX[hand.best_total - 13][
-                    get_dealer_index(card_val=dealer_up.rank)
-                ]
-            )
-        else:
-            return map_result_char(
-                HARD_MATRIX[hand.best_total - 4][
-                    get_dealer_index(card_val=dealer_up.rank)
-                ]
-            )
+        return self.strategy.lookup(hand, dealer_up)
 
     def decide_bet_amount(self, curr_bet_unit: int, shoe_length: int) -> int:
         true_count = self.running_count / max((shoe_length / 52), 1)
         return max(int(max(1, true_count) * curr_bet_unit), curr_bet_unit)
+
+
+class CountingPlayer(Player):
+    subscribed_events = CardCounter.subscribed_events
+
+    def __init__(
+        self,
+        bankroll=1000,
+        system: str = "Hi-Lo",
+        strategy: StrategyTable = CHART_STRATEGY,
+        counter: Optional[CardCounter] = None,
+        max_units: int = 8,
+    ):
+        super().__init__(bankroll)
+        self.system = system
+        self.strategy = strategy
+        self.counter = counter if counter is not None else CardCounter()
+        self.max_units = max_units
+
+    def __repr__(self):
+        return f"{self.system} Counting Player"
+
+    def on_event(self, event: GameEvent) -> None:
+        self.counter.on_event(event)
+
+    def decide_move(
+        self, hand: Hand, dealer_up: Card, rules: HouseRules
+    ) -> Literal["hit", "stand", "double", "surrender"]:
+        # The first shoe is dealt without a reshuffle event, so the deck count
+        # comes from the rules. No count starts above zero, so the bet placed
+        # before this is the minimum whatever the shoe size
+        if self.counter.num_decks != rules.num_decks:
+            self.counter.set_num_decks(rules.num_decks)
+        return self.strategy.lookup(hand, dealer_up)
+
+    def decide_bet_amount(self, curr_bet_unit: int, shoe_length: int) -> int:
+        if self.system in BALANCED_SYSTEMS:
+            count = self.counter.true_count(self.system, shoe_length)
+        else:
+            count = self.counter.running_count(self.system)
+        return int(min(max(1, count), self.max_units)) * curr_bet_unit
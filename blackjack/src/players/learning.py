@@ -1,12 +1,41 @@
-from typing import Literal
-import random
+from typing import Literal, Optional
 import pickle
 import os
+import numpy as np
 from ..card import Card
 from ..hand import Hand
 from ..rules import HouseRules
+from ..utils.model_format import MODEL_EXTENSION, is_model_file, load_q_model, save_q_model
 from .base import Player
 
+# Actions are ordered so the valid ones for a decision are always a prefix
+ACTIONS = ("hit", "stand", "double", "surrender")
+DEFAULT_Q_VALUES = (-0.1, -0.1, -0.3, -0.5)
+
+NUM_TOTALS = 32
+NUM_DEALER_VALUES = 12
+NUM_STATES = NUM_TOTALS * NUM_DEALER_VALUES * 2
+
+REWARDS = {
+    "win": 1.0,
+    "loss": -1.0,
+    "push": 0.0,
+    "blackjack": 1.5,
+    "surr_loss": -0.5,
+    "broke": -10.0,
+}
+
+
+def state_index(player_total: int, dealer_value: int, has_usable_ace: bool) -> int:
+    return (player_total * NUM_DEALER_VALUES + dealer_value) * 2 + has_usable_ace
+
+
+def state_key(index: int) -> tuple:
+    rest, has_usable_ace = divmod(index, 2)
+    player_total, dealer_value = divmod(rest, NUM_DEALER_VALUES)
+    return (player_total, dealer_value, bool(has_usable_ace))
+
+
 class QLearningPlayer(Player):
     def __init__(
         self,
@@ -15,6 +44,7 @@ class QLearningPlayer(Player):
         discount_factor: float = 0.95,
         epsilon: float = 0.1,
         training_mode: bool = True,
+        update_batch: int = 1000,
     ):
         super().__init__(bankroll)
 
@@ -22,50 +52,101 @@ class QLearningPlayer(Player):
         self.discount_factor = discount_factor
         self.epsilon = epsilon
         self.training_mode = training_mode
+        self.update_batch = update_batch
 
-        self.q_table = {}
+        self.q_values = np.tile(np.array(DEFAULT_Q_VALUES), (NUM_STATES, 1))
+        self.q_visited = np.zeros((NUM_STATES, len(ACTIONS)), dtype=bool)
+        self.model_path: Optional[str] = None
+        # Fingerprint of the rules the loaded model was trained under, if it recorded them
+        self.model_rules: Optional[str] = None
+        self._refresh_policy()
 
-        self.current_episode = []
+        self.current_episode: list[tuple[int, int]] = []
+        self._pending_hands = 0
+        self._pending_states: list[int] = []
+        self._pending_actions: list[int] = []
+        self._pending_rewards: list[float] = []
+        self._pending_next: list[int] = []
 
-    def _get_state(self, hand: Hand, dealer_up: Card) -> tuple:
-        player_total = hand.best_total
-        dealer_value = dealer_up.hard_value
-        has_usable_ace = hand.is_soft
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        # A memory-mapped model is re-mapped by the receiving process instead of copied
+        if isinstance(self.q_values, np.memmap):
+            del state["q_values"], state["q_visited"], state["_policy"]
+        return state
 
-        return (player_total, dealer_value, has_usable_ace)
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        if "q_values" not in state:
+            self.q_values, self.q_visited, _ = load_q_model(self.model_path)
+            self._refresh_policy()
 
-    def _get_q_value(self, state: tuple, action: str) -> float:
-        if (state, action) not in self.q_table:
-            if action == "surrender":
-                return -0.5
-            elif action == "double":
-                return -0.3
-            else:
-                return -0.1
-        return self.q_table[(state, action)]
+    def clone(self, bankroll: int = 1000) -> "QLearningPlayer":
+        player = QLearningPlayer(
+            bankroll=bankroll,
+            learning_rate=self.learning_rate,
+            discount_factor=self.discount_factor,
+            epsilon=self.epsilon,
+            training_mode=self.training_mode,
+            update_batch=self.update_batch,
+        )
+        # Playing clones share the (possibly memory-mapped) model; training clones get a copy
+        if self.training_mode:
+            player.q_values, player.q_visited = np.array(self.q_values), np.array(self.q_visited)
+            player._refresh_policy()
+        else:
+            player.q_values, player.q_visited, player._policy = self.q_values, self.q_visited, self._policy
+        player.model_path = self.model_path
+        player.model_rules = self.model_rules
+        return player
+
+    def _refresh_policy(self) -> None:
+        # Greedy action per state for each number of valid actions
+        self._policy = {
+            num_valid: self.q_values[:, :num_valid].argmax(axis=1).tolist()
+            for num_valid in (2, 3, 4)
+        }
+
+    def _get_state(self, hand: Hand, dealer_up: Card) -> int:
+        return state_index(hand.best_total, dealer_up.hard_value, hand.is_soft)
+
+    @property
+    def q_table(self) -> dict:
+        return {
+            (state_key(state), ACTIONS[action]): float(self.q_values[state, action])
+            for state, action in zip(*np.nonzero(self.q_visited))
+        }
+
+    @q_table.setter
+    def q_table(self, table: dict) -> None:
+        self.q_values = np.tile(np.array(DEFAULT_Q_VALUES), (NUM_STATES, 1))
+        self.q_visited = np.zeros((NUM_STATES, len(ACTIONS)), dtype=bool)
+        self.model_path = None
+        self.model_rules = None
+        for (state, action), value in table.items():
+            index = state_index(*state)
+            self.q_values[index, ACTIONS.index(action)] = value
+            self.q_visited[index, ACTIONS.index(action)] = True
+        self._refresh_policy()
 
     def decide_move(
         self, hand: Hand, dealer_up: Card, rules: HouseRules
     ) -> Literal["hit", "stand", "double", "surrender"]:
         state = self._get_state(hand, dealer_up)
 
-        valid_actions = ["hit", "stand"]
+        num_valid = 2
+        if len(hand.codes) == 2:
+            num_valid = 4 if rules.surrender != "none" else 3
 
-        if len(hand.cards) == 2:
-            valid_actions.append("double")
-            if rules.surrender != "none":
-                valid_actions.append("surrender")
-
-        if self.training_mode and random.random() < self.epsilon:
-            action = random.choice(valid_actions)
+        if self.training_mode and self.rng.random() < self.epsilon:
+            action = self.rng.randrange(num_valid)
         else:
-            q_values = {act: self._get_q_value(state, act) for act in valid_actions}
-            action = max(q_values, key=q_values.get)
+            action = self._policy[num_valid][state]
 
         if self.training_mode:
-            self.current_episode.append({"state": state, "action": action})
+            self.current_episode.append((state, action))
 
-        return action
+        return ACTIONS[action]
 
     def decide_bet_amount(self, curr_bet_unit: int, shoe_length: int) -> int:
         return curr_bet_unit
@@ -74,45 +155,69 @@ class QLearningPlayer(Player):
         if not self.training_mode or not self.current_episode:
             return
 
-        reward_map = {
-            "win": 1.0,
-            "loss": -1.0,
-            "push": 0.0,
-            "blackjack": 1.5,
-            "surr_loss": -0.5,
-            "broke": -10.0,
-        }
-        reward = reward_map.get(outcome, 0.0)
+        reward = REWARDS.get(outcome, 0.0)
+        for i, (state, action) in enumerate(self.current_episode):
+            self._pending_states.append(state)
+            self._pending_actions.append(action)
+            self._pending_rewards.append(reward)
+            is_last = i == len(self.current_episode) - 1
+            self._pending_next.append(-1 if is_last else self.current_episode[i + 1][0])
 
-        num_decisions = len(self.current_episode)
-
-        for i in range(num_decisions - 1, -1, -1):
-            decision = self.current_episode[i]
-            state = decision["state"]
-            action = decision["action"]
+        self.current_episode = []
+        self._pending_hands += 1
+        if self._pending_hands >= self.update_batch:
+            self.flush_updates()
 
-            current_q = self._get_q_value(state, action)
+    def flush_updates(self) -> None:
+        if not self._pending_states:
+            return
 
-            if i == num_decisions - 1:
-                max_future_q = 0.0
-            else:
-                next_state = self.current_episode[i + 1]["state"]
-                max_future_q = max(
-                    self._get_q_value(next_state, "hit"),
-                    self._get_q_value(next_state, "stand"),
-                )
+        states = np.array(self._pending_states)
+        actions = np.array(self._pending_actions)
+        next_states = np.array(self._pending_next)
+        future = np.where(
+            next_states >= 0, self.q_values[next_states, :2].max(axis=1), 0.0
+        )
+        targets = np.array(self._pending_rewards) + self.discount_factor * future
 
-            new_q = current_q + self.learning_rate * (
-                reward + self.discount_factor * max_future_q - current_q
-            )
+        # Repeated (state, action) pairs move towards their mean target with the
+        # combined step of that many sequential updates
+        flat = states * len(ACTIONS) + actions
+        counts = np.bincount(flat, minlength=self.q_values.size)
+        sums = np.bincount(flat, weights=targets, minlength=self.q_values.size)
+        touched = np.nonzero(counts)[0]
+        q = self.q_values.reshape(-1)
+        rate = 1 - (1 - self.learning_rate) ** counts[touched]
+        q[touched] += rate * (sums[touched] / counts[touched] - q[touched])
+        self.q_visited.reshape(-1)[touched] = True
 
-            self.q_table[(state, action)] = new_q
+        self._pending_hands = 0
+        self._pending_states = []
+        self._pending_actions = []
+        self._pending_rewards = []
+        self._pending_next = []
+        self._refresh_policy()
 
-        self.current_episode = []
+    def save_model(self, filepath: str, rules: Optional[HouseRules] = None):
+        self.flush_updates()
+        if filepath.endswith(MODEL_EXTENSION):
+            save_q_model(
+                filepath,
+                self.q_values,
+                self.q_visited,
+                hyperparameters={
+                    "learning_rate": self.learning_rate,
+                    "discount_factor": self.discount_factor,
+                    "epsilon": self.epsilon,
+                },
+                rules=rules,
+            )
+            print(f"✓ Model saved: {int(self.q_visited.sum())} states learned")
+            return
 
-    def save_model(self, filepath: str):
+        q_table = self.q_table
         model_data = {
-            "q_table": self.q_table,
+            "q_table": q_table,
             "learning_rate": self.learning_rate,
             "discount_factor": self.discount_factor,
         }
@@ -121,18 +226,39 @@ class QLearningPlayer(Player):
         with open(filepath, "wb") as f:
             pickle.dump(model_data, f)
 
-        print(f"✓ Model saved: {len(self.q_table)} states learned")
+        print(f"✓ Model saved: {len(q_table)} states learned")
 
-    def load_model(self, filepath: str):
+    def check_rules(self, rules: HouseRules) -> bool:
+        if self.model_rules is None or self.model_rules == rules.fingerprint():
+            return True
+        print(f"⚠ Model {self.model_path} was trained under different house rules")
+        return False
+
+    def load_model(self, filepath: str, rules: Optional[HouseRules] = None):
         if not os.path.exists(filepath):
             print(f"⚠ Model file not found: {filepath}")
             return
 
+        if is_model_file(filepath):
+            q_values, q_visited, header = load_q_model(filepath)
+            if self.training_mode:
+                q_values, q_visited = np.array(q_values), np.array(q_visited)
+            self.q_values, self.q_visited = q_values, q_visited
+            self.model_path = filepath
+            self.model_rules = header["rules_fingerprint"]
+            self.learning_rate = header["hyperparameters"]["learning_rate"]
+            self.discount_factor = header["hyperparameters"]["discount_factor"]
+            self._refresh_policy()
+            print(f"✓ Model loaded: {int(self.q_visited.sum())} states")
+            if rules is not None:
+                self.check_rules(rules)
+            return
+
         with open(filepath, "rb") as f:
             model_data = pickle.load(f)
 
         self.q_table = model_data["q_table"]
-        print(f"✓ Model loaded: {len(self.q_table)} states")
+        print(f"✓ Model loaded: {int(self.q_visited.sum())} states")
 
     def __repr__(self):
         mode = "Training" if self.training_mode else "Playing"
@@ -0,0 +1,74 @@
+from typing import Callable, Optional, TypeVar
+from time import perf_counter
+from .events import GameEvent
+
+F = TypeVar("F", bound=Callable)
+
+# Phases are timed inclusively: _round_result also runs inside the turn that
+# settles the round, and observer callbacks inside whichever phase fired them
+GAME_PHASES = (
+    "play_round",
+    "_check_reshuffle",
+    "_deal",
+    "_player_turn",
+    "_dealer_turn",
+    "_round_result",
+)
+
+
+class PhaseProfiler:
+    def __init__(self):
+        self.calls: dict[str, int] = {}
+        self.seconds: dict[str, float] = {}
+
+    def wrap(self, name: str, func: F) -> F:
+        calls, seconds = self.calls, self.seconds
+        calls.setdefault(name, 0)
+        seconds.setdefault(name, 0.0)
+
+        def timed(*args, **kwargs):
+            start = perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                seconds[name] += perf_counter() - start
+                calls[name] += 1
+
+        return timed
+
+    def merge(self, other: "PhaseProfiler") -> "PhaseProfiler":
+        merged = PhaseProfiler()
+        for profiler in (self, other):
+            for name, count in profiler.calls.items():
+                merged.calls[name] = merged.calls.get(name, 0) + count
+                merged.seconds[name] = merged.seconds.get(name, 0.0) + profiler.seconds[name]
+        return merged
+
+    def report(self) -> dict[str, dict[str, float]]:
+        total = self.seconds.get("play_round", 0.0)
+        return {
+            name: {
+                "calls": self.calls[name],
+                "total_seconds": seconds,
+                "mean_us": seconds / self.calls[name] * 1e6 if self.calls[name] else 0.0,
+                "share": seconds / total if total else 0.0,
+            }
+            for name, seconds in self.seconds.items()
+        }
+
+    def format_report(self) -> str:
+        lines = [f"{'phase':<36} {'calls':>10} {'total s':>10} {'mean us':>10} {'share':>7}"]
+        for name, row in sorted(self.report().items(), key=lambda item: -item[1]["total_seconds"]):
+            lines.append(
+                f"{name:<36} {row['calls']:>10,} {row['total_seconds']:>10.3f} "
+                f"{row['mean_us']:>10.2f} {row['share']:>7.1%}"
+            )
+        return "\n".join(lines)
+
+
+class TimedObserver:
+    def __init__(self, observer, profiler: PhaseProfiler, name: Optional[str] = None):
+        self.observer = observer
+        self.on_event: Callable[[GameEvent], None] = profiler.wrap(
+            name or f"{type(observer).__name__}.on_event", observer.on_event
+        )
@@ -0,0 +1,201 @@
+from typing import Optional
+import json
+import os
+import struct
+import numpy as np
+from .counting import BALANCED_SYSTEMS, SYSTEM_NAMES, TAG_MATRIX, initial_running_count
+from .events import GameEvent, RoundRecord
+from .rules import HouseRules
+
+# Layout: magic, version, header length, JSON header padded so the records
+# start on a 64-byte boundary, then one fixed-width record per round
+MAGIC = b"BJROUND\x00"
+FORMAT_VERSION = 1
+_PREFIX = struct.Struct("<8sII")
+_ALIGNMENT = 64
+
+ROUND_EXTENSION = ".rounds"
+NO_CARD = 255
+
+OUTCOMES = ("win", "loss", "push", "blackjack", "surr_loss", "broke")
+RECORD_ACTIONS = ("stand", "hit", "double", "surrender")
+
+ROUND_DTYPE = np.dtype([
+    ("round", "<u8"),
+    ("card1", "u1"),
+    ("card2", "u1"),
+    ("upcard", "u1"),
+    ("hole", "u1"),
+    ("player_cards", "u1"),
+    ("player_total", "u1"),
+    ("dealer_cards", "u1"),
+    ("dealer_total", "u1"),
+    ("action", "u1"),
+    ("outcome", "u1"),
+    ("reshuffled", "?"),
+    # Counts before the round is dealt, in SYSTEM_NAMES and BALANCED_SYSTEMS order
+    ("running_counts", "<f4", (len(SYSTEM_NAMES),)),
+    ("true_counts", "<f4", (len(BALANCED_SYSTEMS),)),
+    ("bet", "<f8"),
+    ("payout", "<f8"),
+    ("bankroll", "<f8"),
+])
+
+
+class RoundRecorder:
+    subscribed_events = (RoundRecord,)
+
+    def __init__(
+        self,
+        filepath: str,
+        rules: Optional[HouseRules] = None,
+        buffer_rounds: int = 65_536,
+    ):
+        if rules is None:
+            rules = HouseRules()
+        self.filepath = filepath
+        self.num_decks = rules.num_decks
+        self.buffer_rounds = buffer_rounds
+        self.rounds = 0
+
+        # Counts, true counts and payouts are filled in per batch when it is
+        # written, from the cards dealt in it and the counts the last batch ended on
+        self._initial_counts = np.array(
+            [initial_running_count(name, self.num_decks) for name in SYSTEM_NAMES], dtype=float
+        )
+        self._counts = self._initial_counts.copy()
+        self._cards_seen = 0
+        self._dealt = bytearray()
+        self._true_columns = [SYSTEM_NAMES.index(name) for name in BALANCED_SYSTEMS]
+        payouts = {"win": 1.0, "loss": -1.0, "push": 0.0, "blackjack": rules.blackjack_payout, "surr_loss": -0.5}
+        self._payouts = np.array([payouts.get(outcome, 0.0) for outcome in OUTCOMES])
+        self._outcomes = {outcome: i for i, outcome in enumerate(OUTCOMES)}
+
+        self._buffer = np.zeros(buffer_rounds, dtype=ROUND_DTYPE)
+        self._columns = {name: self._buffer[name] for name in ROUND_DTYPE.names}
+        self._filled = 0
+
+        header = {
+            "dtype": ROUND_DTYPE.descr,
+            "outcomes": OUTCOMES,
+            "actions": RECORD_ACTIONS,
+            "systems": SYSTEM_NAMES,
+            "true_count_systems": BALANCED_SYSTEMS,
+        }
+        encoded = json.dumps(header).encode()
+        encoded += b" " * (-(_PREFIX.size + len(encoded)) % _ALIGNMENT)
+        directory = os.path.dirname(filepath)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(filepath, "wb")
+        self._file.write(_PREFIX.pack(MAGIC, FORMAT_VERSION, len(encoded)))
+        self._file.write(encoded)
+
+    def __enter__(self) -> "RoundRecorder":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def on_event(self, event: GameEvent) -> None:
+        player, dealer = event.player_cards, event.dealer_cards
+        if event.outcome == "surr_loss":
+            action = 3
+        elif event.doubled:
+            action = 2
+        elif len(player) > 2:
+            action = 1
+        else:
+            action = 0
+
+        i = self._filled
+        columns = self._columns
+        columns["player_cards"][i] = len(player)
+        columns["player_total"][i] = event.player_total
+        columns["dealer_cards"][i] = len(dealer)
+        columns["dealer_total"][i] = event.dealer_total
+        columns["action"][i] = action
+        columns["outcome"][i] = self._outcomes[event.outcome]
+        columns["reshuffled"][i] = event.reshuffled
+        columns["bet"][i] = event.bet
+        columns["bankroll"][i] = event.bankroll
+        self._dealt += player
+        self._dealt += dealer
+        self.rounds += 1
+        self._filled = i + 1
+
+        if self._filled == self.buffer_rounds:
+            self.flush()
+
+    def _fill_batch(self, rows: np.ndarray) -> None:
+        num_rows = len(rows)
+        player_cards = rows["player_cards"].astype(np.int64)
+        dealer_cards = rows["dealer_cards"].astype(np.int64)
+        per_row = player_cards + dealer_cards
+        dealt = np.frombuffer(self._dealt, dtype=np.uint8)
+        rows["round"] = np.arange(self.rounds - num_rows, self.rounds)
+
+        # Each round's cards follow the previous round's in dealt; the padding
+        # keeps the lookups for rounds without hands in range
+        first = np.cumsum(per_row) - per_row
+        padded = np.append(dealt, [NO_CARD, NO_CARD])
+        rows["card1"] = np.where(player_cards > 0, padded[first], NO_CARD)
+        rows["card2"] = np.where(player_cards > 1, padded[first + 1], NO_CARD)
+        rows["upcard"] = np.where(dealer_cards > 0, padded[first + player_cards], NO_CARD)
+        rows["hole"] = np.where(dealer_cards > 1, padded[first + player_cards + 1], NO_CARD)
+
+        # Counts before each round are the tags of the cards dealt since the
+        # last reshuffle, or since the start of the batch on the carried counts
+        owner = np.repeat(np.arange(num_rows), per_row)
+        row_tags = np.stack(
+            [np.bincount(owner, weights=TAG_MATRIX[dealt, s], minlength=num_rows) for s in range(len(SYSTEM_NAMES))],
+            axis=1,
+        )
+        tags_before = np.cumsum(row_tags, axis=0) - row_tags
+
+        last_reshuffle = np.maximum.accumulate(np.where(rows["reshuffled"], np.arange(num_rows), -1))
+        reset = last_reshuffle >= 0
+        base = np.maximum(last_reshuffle, 0)
+        counts = np.where(reset[:, None], self._initial_counts - tags_before[base], self._counts) + tags_before
+        seen = np.where(reset, -first[base], self._cards_seen) + first
+
+        rows["running_counts"] = counts
+        decks_remaining = np.maximum((self.num_decks * 52 - seen) / 52, 1)
+        rows["true_counts"] = counts[:, self._true_columns] / decks_remaining[:, None]
+
+        self._counts = counts[-1] + row_tags[-1]
+        self._cards_seen = int(seen[-1] + per_row[-1])
+        self._dealt = bytearray()
+
+    def flush(self) -> None:
+        if self._filled:
+            rows = self._buffer[:self._filled]
+            self._fill_batch(rows)
+            rows["payout"] = rows["bet"] * self._payouts[rows["outcome"]]
+            self._file.write(rows.tobytes())
+            self._filled = 0
+        self._file.flush()
+
+    def close(self) -> None:
+        if not self._file.closed:
+            self.flush()
+            self._file.close()
+
+
+def load_rounds(filepath: str) -> np.memmap:
+    with open(filepath, "rb") as f:
+        magic, version, header_length = _PREFIX.unpack(f.read(_PREFIX.size))
+        if magic != MAGIC:
+            raise ValueError(f"{filepath} is not a round log")
+        if version != FORMAT_VERSION:
+            raise ValueError(f"Unsupported round log version {version} in {filepath}")
+        header = json.loads(f.read(header_length))
+
+    # JSON turns the subarray shapes into lists
+    dtype = np.dtype([
+        tuple(tuple(part) if isinstance(part, list) else part for part in field)
+        for field in header["dtype"]
+    ])
+    offset = _PREFIX.size + header_length
+    count = (os.path.getsize(filepath) - offset) // dtype.itemsize
+    return np.memmap(filepath, dtype=dtype, mode="r", offset=offset, shape=(count,))
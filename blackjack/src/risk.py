@@ -0,0 +1,143 @@
+from typing import Optional
+from dataclasses import dataclass
+from collections import Counter
+import random
+import numpy as np
+from .game import Game
+from .players.base import Player
+from .rules import HouseRules
+
+PERCENTILES = (5, 25, 50, 75, 95)
+# Trajectory blocks are kept to about this many cells (sessions x hands)
+BLOCK_CELLS = 8_000_000
+MEASURING_BANKROLL = 1e12
+
+
+@dataclass(frozen=True)
+class OutcomeDistribution:
+    # Net result of one hand in units of the base bet, with its probability
+    values: np.ndarray
+    probabilities: np.ndarray
+
+    @classmethod
+    def from_counts(cls, counts: dict[float, int]) -> "OutcomeDistribution":
+        values = np.array(sorted(counts), dtype=float)
+        weights = np.array([counts[value] for value in sorted(counts)], dtype=float)
+        return cls(values=values, probabilities=weights / weights.sum())
+
+    @property
+    def mean(self) -> float:
+        return float(self.values @ self.probabilities)
+
+    @property
+    def std(self) -> float:
+        return float((((self.values - self.mean) ** 2) @ self.probabilities) ** 0.5)
+
+
+def measure_outcomes(
+    player: Player,
+    rules: HouseRules = None,
+    num_hands: int = 100_000,
+    base_bet: int = 5,
+    seed: Optional[int] = None,
+) -> OutcomeDistribution:
+    if rules is None:
+        rules = HouseRules()
+    rng = random.Random(seed)
+    player.rng = random.Random(rng.getrandbits(64))
+    game = Game(rules=rules, player=player, bet=base_bet, rng=rng)
+    if hasattr(player, "on_event"):
+        game.add_observer(player)
+
+    # Every hand starts from a bankroll that can't run out, so the measured
+    # outcomes are never cut short by the broke check
+    bankroll = player.bankroll
+    counts: Counter = Counter()
+    for _ in range(num_hands):
+        player.bankroll = MEASURING_BANKROLL
+        game.play_round()
+        counts[(player.bankroll - MEASURING_BANKROLL) / base_bet] += 1
+    player.bankroll = bankroll
+    return OutcomeDistribution.from_counts(counts)
+
+
+@dataclass
+class SessionResults:
+    bankroll: float
+    base_bet: int
+    num_hands: int
+    ruined: np.ndarray
+    ruin_hands: np.ndarray
+    final_bankrolls: np.ndarray
+    checkpoints: np.ndarray
+    bands: dict[int, np.ndarray]
+
+    @property
+    def risk_of_ruin(self) -> float:
+        return float(self.ruined.mean())
+
+    def ruin_histogram(self, bins: int = 50) -> tuple[np.ndarray, np.ndarray]:
+        return np.histogram(self.ruin_hands[self.ruined], bins=bins, range=(1, self.num_hands + 1))
+
+    def summary(self) -> dict[str, float]:
+        return {
+            "risk_of_ruin": self.risk_of_ruin,
+            "median_ruin_hand": float(np.median(self.ruin_hands[self.ruined])) if self.ruined.any() else float("nan"),
+            "mean_final_bankroll": float(self.final_bankrolls.mean()),
+            **{f"p{q}_final_bankroll": float(np.percentile(self.final_bankrolls, q)) for q in PERCENTILES},
+        }
+
+
+def simulate_sessions(
+    distribution: OutcomeDistribution,
+    bankroll: float = 1000,
+    num_hands: int = 5000,
+    base_bet: int = 5,
+    num_sessions: int = 100_000,
+    seed: Optional[int] = None,
+    num_checkpoints: int = 100,
+) -> SessionResults:
+    rng = np.random.default_rng(seed)
+    cdf = np.cumsum(distribution.probabilities)
+    cdf[-1] = 1.0
+    steps = distribution.values * base_bet
+    checkpoints = np.unique(np.linspace(1, num_hands, min(num_checkpoints, num_hands)).astype(int))
+
+    ruined = np.zeros(num_sessions, dtype=bool)
+    ruin_hands = np.zeros(num_sessions, dtype=np.int64)
+    final = np.zeros(num_sessions)
+    sampled = np.zeros((num_sessions, len(checkpoints)))
+
+    block = max(1, BLOCK_CELLS // num_hands)
+    for start in range(0, num_sessions, block):
+        rows = slice(start, min(start + block, num_sessions))
+        n = rows.stop - rows.start
+        outcomes = np.searchsorted(cdf, rng.random((n, num_hands)), side="right")
+        paths = bankroll + np.cumsum(steps[outcomes], axis=1)
+
+        # Like Game, a session ends once the bankroll can't cover the next bet;
+        # every checkpoint after that hand sees the ruined bankroll. Resampled
+        # hands don't know the bankroll, so a double the player couldn't afford
+        # still loses two units
+        below = paths < base_bet
+        hit = below.any(axis=1)
+        first = np.where(hit, below.argmax(axis=1), num_hands - 1)
+        at_ruin = paths[np.arange(n), first]
+
+        ruined[rows] = hit
+        ruin_hands[rows] = np.where(hit, first + 1, 0)
+        final[rows] = at_ruin
+        sampled[rows] = np.where(
+            checkpoints - 1 > first[:, None], at_ruin[:, None], paths[:, checkpoints - 1]
+        )
+
+    return SessionResults(
+        bankroll=bankroll,
+        base_bet=base_bet,
+        num_hands=num_hands,
+        ruined=ruined,
+        ruin_hands=ruin_hands,
+        final_bankrolls=final,
+        checkpoints=checkpoints,
+        bands={q: np.percentile(sampled, q, axis=0) for q in PERCENTILES},
+    )
@@ -1,4 +1,7 @@
-from dataclasses import dataclass
+from typing import Iterable, Optional
+from dataclasses import dataclass, asdict
+import hashlib
+import json
 
 @dataclass
 class HouseRules:
@@ -13,4 +16,12 @@ class HouseRules:
     hit_split_aces: bool = False
     max_splits: int = 3
     reshuffle_threshold: float = 0.25
-    continuous_reshuffle = False
+    continuous_reshuffle: bool = False
+    infinite_deck: bool = False
+
+    def fingerprint(self, fields: Optional[Iterable[str]] = None) -> str:
+        values = asdict(self)
+        if fields is not None:
+            values = {name: values[name] for name in fields}
+        encoded = json.dumps(values, sort_keys=True).encode()
+        return hashlib.sha256(encoded).hexdigest()[:16]
@@ -0,0 +1,198 @@
+from typing import Iterable, Optional, Sequence, Union
+import random
+import numpy as np
+from .card import CARDS, Card, CODE_VALUE_INDEX, NUM_CODES
+from .rules import HouseRules
+
+ShoeRng = Union[random.Random, np.random.Generator]
+
+NUM_VALUE_INDICES = 10
+UNIFORM_BLOCK = 4096
+
+
+class Shoe:
+    def __init__(
+        self,
+        num_decks: int = 1,
+        rng: Optional[ShoeRng] = None,
+        reshuffle_threshold: float = 0.0,
+    ):
+        self.num_decks = num_decks
+        self.rng: ShoeRng = rng if rng is not None else random.Random()
+        self.reshuffle_threshold = reshuffle_threshold
+        self._ordered = bytes(range(NUM_CODES)) * num_decks
+        self._full_counts = [0] * NUM_VALUE_INDICES
+        for code in self._ordered:
+            self._full_counts[CODE_VALUE_INDEX[code]] += 1
+
+        self.cards = bytearray(self._ordered)
+        self.size = len(self.cards)
+        self.cursor = 0
+        self._value_counts = list(self._full_counts)
+        self._block: list[float] = []
+        self._block_index = 0
+        self.shuffle()
+
+    def __len__(self) -> int:
+        return self.size - self.cursor
+
+    def _uniform(self) -> float:
+        if not isinstance(self.rng, np.random.Generator):
+            return self.rng.random()
+        # Generator calls are expensive one at a time, so uniforms are drawn in blocks
+        if self._block_index >= len(self._block):
+            self._block = self.rng.random(UNIFORM_BLOCK).tolist()
+            self._block_index = 0
+        self._block_index += 1
+        return self._block[self._block_index - 1]
+
+    def shuffle(self) -> None:
+        # Restoring the ordered buffer first makes each shuffle depend only on the RNG state
+        self.cards[:] = self._ordered
+        if isinstance(self.rng, np.random.Generator):
+            self.rng.shuffle(np.frombuffer(self.cards, dtype=np.uint8))
+        else:
+            self.rng.shuffle(self.cards)
+        self.cursor = 0
+        self._value_counts[:] = self._full_counts
+
+    @property
+    def needs_reshuffle(self) -> bool:
+        return self.size - self.cursor <= self.size * self.reshuffle_threshold
+
+    def draw(self) -> int:
+        code = self.cards[self.cursor]
+        self.cursor += 1
+        self._value_counts[CODE_VALUE_INDEX[code]] -= 1
+        return code
+
+    def draw_card(self) -> Card:
+        return CARDS[self.draw()]
+
+    def burn(self, count: int) -> None:
+        for code in self.cards[self.cursor:self.cursor + count]:
+            self._value_counts[CODE_VALUE_INDEX[code]] -= 1
+        self.cursor = min(self.cursor + count, self.size)
+
+    def withhold(self, codes: Iterable[int]) -> None:
+        # Moves the given cards behind the cursor as if they had been dealt,
+        # e.g. the cards still on the table when the shoe is reshuffled mid-round
+        cards = self.cards
+        for code in codes:
+            pick = cards.index(code, self.cursor)
+            cards[pick] = cards[self.cursor]
+            cards[self.cursor] = code
+            self.cursor += 1
+            self._value_counts[CODE_VALUE_INDEX[code]] -= 1
+
+    def composition(self) -> tuple[int, ...]:
+        return tuple(self._value_counts)
+
+    def remaining(self, value_index: int) -> int:
+        return self._value_counts[value_index]
+
+    def remaining_codes(self) -> bytes:
+        return bytes(self.cards[self.cursor:])
+
+
+class ContinuousShoe(Shoe):
+    # A continuous shuffling machine: each card is drawn uniformly from the cards
+    # still in the machine and swapped behind the cursor. The round's discards go
+    # back in at the next reshuffle check by resetting the cursor, which observers
+    # see as a reshuffle every round
+    def shuffle(self) -> None:
+        self.cursor = 0
+        self._value_counts[:] = self._full_counts
+
+    @property
+    def needs_reshuffle(self) -> bool:
+        return self.cursor > 0
+
+    def draw(self) -> int:
+        cards, cursor = self.cards, self.cursor
+        pick = cursor + int(self._uniform() * (self.size - cursor))
+        code = cards[pick]
+        cards[pick] = cards[cursor]
+        cards[cursor] = code
+        self.cursor = cursor + 1
+        self._value_counts[CODE_VALUE_INDEX[code]] -= 1
+        return code
+
+
+class InfiniteShoe(Shoe):
+    # Every card is drawn independently with single-deck probabilities, so the
+    # composition never changes and the shoe never needs reshuffling
+    def shuffle(self) -> None:
+        self.cursor = 0
+
+    @property
+    def needs_reshuffle(self) -> bool:
+        return False
+
+    def draw(self) -> int:
+        return int(self._uniform() * NUM_CODES)
+
+    def remaining_codes(self) -> bytes:
+        return self._ordered
+
+
+class ReplayExhausted(Exception):
+    pass
+
+
+class ReplayShoe(Shoe):
+    # Deals recorded shoe orders instead of shuffling. Each reshuffle loads the
+    # next recorded shoe, and a shoe that runs out mid-round continues into the
+    # next one, so card streams split at arbitrary points still deal in order
+    def __init__(
+        self,
+        shoes: Sequence[bytes],
+        reshuffle_threshold: float = 0.0,
+        num_decks: Optional[int] = None,
+    ):
+        self.shoes = list(shoes)
+        self.shoe_index = -1
+        if num_decks is None:
+            num_decks = max((len(shoe) for shoe in self.shoes), default=0) // NUM_CODES
+        self.num_decks = num_decks
+        self.rng = None
+        self.reshuffle_threshold = reshuffle_threshold
+        self._ordered = b""
+        self._full_counts = [0] * NUM_VALUE_INDICES
+        self.cards = bytearray()
+        self.size = 0
+        self.cursor = 0
+        self._value_counts = list(self._full_counts)
+        self.shuffle()
+
+    def shuffle(self) -> None:
+        self.shoe_index += 1
+        if self.shoe_index >= len(self.shoes):
+            raise ReplayExhausted(f"All {len(self.shoes)} recorded shoes have been dealt")
+        self._ordered = self.shoes[self.shoe_index]
+        self._full_counts = [0] * NUM_VALUE_INDICES
+        for code in self._ordered:
+            self._full_counts[CODE_VALUE_INDEX[code]] += 1
+        self.cards = bytearray(self._ordered)
+        self.size = len(self.cards)
+        self.cursor = 0
+        self._value_counts = list(self._full_counts)
+
+    @property
+    def needs_reshuffle(self) -> bool:
+        # A history can start part way through a shoe, so the reshuffle point
+        # is measured against a full shoe rather than the recorded one
+        return self.size - self.cursor <= self.num_decks * NUM_CODES * self.reshuffle_threshold
+
+    def draw(self) -> int:
+        while self.cursor >= self.size:
+            self.shuffle()
+        return super().draw()
+
+
+def make_shoe(rules: HouseRules, rng: Optional[ShoeRng] = None) -> Shoe:
+    if rules.infinite_deck:
+        return InfiniteShoe(rules.num_decks, rng)
+    if rules.continuous_reshuffle:
+        return ContinuousShoe(rules.num_decks, rng)
+    return Shoe(rules.num_decks, rng, rules.reshuffle_threshold)
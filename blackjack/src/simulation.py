@@ -1,8 +1,16 @@
-from typing import Union
-from dataclasses import dataclass, field
+from typing import Iterator, Optional, Union
+from dataclasses import dataclass, field, replace
+from concurrent.futures import ProcessPoolExecutor
+from functools import reduce
+from statistics import NormalDist
+import copy
+import random
+import numpy as np
 from .players.base import Player
 from .rules import HouseRules
-from .game import Game, GameEvent, RoundEndEvent, DoubleDownEvent
+from .game import Game
+from .events import GameEvent, RoundEndEvent, DoubleDownEvent
+from .profiling import PhaseProfiler
 
 
 @dataclass
@@ -14,6 +22,26 @@ class SimulationStatistics:
     bankroll_history: list[float] = field(default_factory=list)
     starting_bankroll: float = 0
     _cumulative_winrates: list[float] = field(default_factory=list)
+    _cumulative_wins: list[int] = field(default_factory=list)
+    streaming: bool = False
+    resolution: int = 1000
+    profit_mean: float = 0.0
+    max_drawdown: float = 0.0
+    _profit_m2: float = 0.0
+    _peak: Optional[float] = None
+    _trough: Optional[float] = None
+    _last_bankroll: Optional[float] = None
+    # Largest bankroll change in a single round, and whether the run ended broke
+    _max_stake: float = 0.0
+    _broke: bool = False
+    _stride: int = 1
+    # Rounds seen, and rounds played before this chunk of a split run; streaming
+    # samples sit on multiples of the stride counted from the start of the run
+    _rounds: int = 0
+    _offset: int = 0
+    profile: Optional[PhaseProfiler] = None
+
+    subscribed_events = (RoundEndEvent, DoubleDownEvent)
     
     def on_event(self, event: GameEvent) -> None:
         if isinstance(event, RoundEndEvent):
@@ -29,11 +57,50 @@ class SimulationStatistics:
             self.losses += 1
         elif outcome == "push":
             self.pushes += 1
-        
-        self.bankroll_history.append(event.bankroll)
+
+        bankroll = event.bankroll
+        if outcome != "broke":
+            profit = bankroll - self.final_bankroll
+            delta = profit - self.profit_mean
+            self.profit_mean += delta / self.total_hands
+            self._profit_m2 += delta * (profit - self.profit_mean)
+            if abs(profit) > self._max_stake:
+                self._max_stake = abs(profit)
+        else:
+            self._broke = True
+
+        if self._peak is None:
+            self._peak = self._trough = self.starting_bankroll
+        if bankroll > self._peak:
+            self._peak = bankroll
+        elif bankroll < self._trough:
+            self._trough = bankroll
+        self.max_drawdown = max(self.max_drawdown, self._peak - bankroll)
+        self._last_bankroll = bankroll
+        self._rounds += 1
+
         total = self.wins + self.losses + self.pushes
-        if total > 0:
-            self._cumulative_winrates.append(self.wins / total)
+        if not self.streaming:
+            self.bankroll_history.append(bankroll)
+            if total > 0:
+                self._cumulative_winrates.append(self.wins / total)
+                self._cumulative_wins.append(self.wins)
+            return
+
+        if (self._offset + self._rounds) % self._stride == 0:
+            self.bankroll_history.append(bankroll)
+            self._cumulative_winrates.append(self.wins / total if total > 0 else 0.0)
+            self._cumulative_wins.append(self.wins)
+            if len(self.bankroll_history) >= 2 * self.resolution:
+                self._downsample()
+
+    def _downsample(self) -> None:
+        # Keeps the samples that fall on multiples of twice the stride
+        start = self._sample_rounds()[0] // self._stride % 2
+        self.bankroll_history = self.bankroll_history[start::2]
+        self._cumulative_winrates = self._cumulative_winrates[start::2]
+        self._cumulative_wins = self._cumulative_wins[start::2]
+        self._stride *= 2
     
     @property
     def total_hands(self) -> int:
@@ -46,14 +113,126 @@ class SimulationStatistics:
     
     @property
     def final_bankroll(self) -> float:
-        return self.bankroll_history[-1] if self.bankroll_history else self.starting_bankroll
+        return self._last_bankroll if self._last_bankroll is not None else self.starting_bankroll
     
     @property
     def net_profit(self) -> float:
         return self.final_bankroll - self.starting_bankroll
-    
+
+    @property
+    def profit_variance(self) -> float:
+        return self._profit_m2 / (self.total_hands - 1) if self.total_hands > 1 else 0.0
+
+    @property
+    def peak_bankroll(self) -> float:
+        return self._peak if self._peak is not None else self.starting_bankroll
+
+    @property
+    def min_bankroll(self) -> float:
+        return self._trough if self._trough is not None else self.starting_bankroll
+
+    @property
+    def _unsampled(self) -> int:
+        return (self._offset + self._rounds) % self._stride
+
+    def _sample_rounds(self) -> range:
+        # Run-wide round number of each bankroll_history entry
+        first = self._offset // self._stride * self._stride + self._stride
+        return range(first, first + len(self.bankroll_history) * self._stride, self._stride)
+
+    def merge(self, other: "SimulationStatistics") -> "SimulationStatistics":
+        # other must continue this run: its _offset is where this one ends.
+        # Both sides are resampled to the coarser stride first, so the merged
+        # history is what a single streaming run would have sampled. A run that
+        # ended broke has nothing to continue, so other is dropped
+        if self._broke:
+            return self.snapshot()
+        offset = self.final_bankroll - other.starting_bankroll
+        total = self.total_hands
+        other_total = other.total_hands
+        stride = max(self._stride, other._stride)
+
+        history = []
+        winrates = []
+        wins = []
+        for round_num, bankroll, rate, won in zip(
+            self._sample_rounds(), self.bankroll_history, self._cumulative_winrates, self._cumulative_wins
+        ):
+            if round_num % stride == 0:
+                history.append(bankroll)
+                winrates.append(rate)
+                wins.append(won)
+        for round_num, bankroll, won in zip(other._sample_rounds(), other.bankroll_history, other._cumulative_wins):
+            if round_num % stride == 0:
+                # Only a final broke round is not a hand
+                hands = min(round_num - other._offset, other_total)
+                history.append(bankroll + offset)
+                winrates.append((self.wins + won) / (total + hands) if total + hands else 0.0)
+                wins.append(self.wins + won)
+
+        merged = SimulationStatistics(
+            wins=self.wins + other.wins,
+            losses=self.losses + other.losses,
+            pushes=self.pushes + other.pushes,
+            doubles=self.doubles + other.doubles,
+            bankroll_history=history,
+            starting_bankroll=self.starting_bankroll,
+            _cumulative_winrates=winrates,
+            _cumulative_wins=wins,
+            streaming=self.streaming,
+            resolution=self.resolution,
+            _stride=stride,
+            _rounds=self._rounds + other._rounds,
+            _offset=self._offset,
+            _max_stake=max(self._max_stake, other._max_stake),
+            _broke=other._broke,
+        )
+
+        count = merged.total_hands
+        if count > 0:
+            delta = other.profit_mean - self.profit_mean
+            merged.profit_mean = self.profit_mean + delta * other_total / count
+            merged._profit_m2 = self._profit_m2 + other._profit_m2 + delta ** 2 * total * other_total / count
+
+        merged._peak = max(self.peak_bankroll, other.peak_bankroll + offset)
+        merged._trough = min(self.min_bankroll, other.min_bankroll + offset)
+        merged.max_drawdown = max(
+            self.max_drawdown, other.max_drawdown, self.peak_bankroll - (other.min_bankroll + offset)
+        )
+        if other._last_bankroll is not None:
+            merged._last_bankroll = other._last_bankroll + offset
+        else:
+            merged._last_bankroll = self._last_bankroll
+
+        if self.profile is not None and other.profile is not None:
+            merged.profile = self.profile.merge(other.profile)
+        else:
+            merged.profile = self.profile or other.profile
+
+        while merged.streaming and len(merged.bankroll_history) >= 2 * merged.resolution:
+            merged._downsample()
+        return merged
+
+    def snapshot(self) -> "SimulationStatistics":
+        return replace(
+            self,
+            bankroll_history=list(self.bankroll_history),
+            _cumulative_winrates=list(self._cumulative_winrates),
+            _cumulative_wins=list(self._cumulative_wins),
+        )
+
+    @classmethod
+    def reduce(cls, stats: list["SimulationStatistics"]) -> "SimulationStatistics":
+        return reduce(cls.merge, stats)
+
     def get_results(self, player_name: str) -> dict[str, Union[int, float, list]]:
-        return {
+        bankroll_history = self.bankroll_history
+        cum_winrates = self._cumulative_winrates
+        if self.streaming and self._unsampled:
+            bankroll_history = bankroll_history + [self.final_bankroll]
+            cum_winrates = cum_winrates + [self.wins / self.total_hands if self.total_hands else 0.0]
+
+        results = {
             "player": player_name,
             "wins": self.wins,
             "losses": self.losses,
@@ -63,9 +242,75 @@ class SimulationStatistics:
             "win_rate": self.win_rate,
             "final_bankroll": self.final_bankroll,
             "net_profit": self.net_profit,
-            "bankroll_history": self.bankroll_history,
-            "cum_winrate": self._cumulative_winrates,
+            "bankroll_history": bankroll_history,
+            "cum_winrate": cum_winrates,
+            "profit_mean": self.profit_mean,
+            "profit_std": self.profit_variance ** 0.5,
+            "max_drawdown": self.max_drawdown,
+            "peak_bankroll": self.peak_bankroll,
+            "min_bankroll": self.min_bankroll,
         }
+        if self.profile is not None:
+            results["profile"] = self.profile.report()
+        return results
+
+
+def spawn_rngs(seed: Optional[int], count: int) -> list[random.Random]:
+    return [
+        random.Random(int.from_bytes(child.generate_state(4).tobytes(), "little"))
+        for child in np.random.SeedSequence(seed).spawn(count)
+    ]
+
+
+def _setup_game(
+    player: Player,
+    rules: HouseRules,
+    base_bet: int,
+    rng: Optional[random.Random] = None,
+    streaming: bool = False,
+    profile: bool = False,
+) -> tuple[Game, SimulationStatistics]:
+    if rng is not None:
+        player.rng = rng
+    game = Game(player=player, rules=rules, bet=base_bet, rng=rng, profile=profile)
+    stats = SimulationStatistics(streaming=streaming, profile=game.profiler)
+    stats.starting_bankroll = player.bankroll
+
+    game.add_observer(stats)
+    if hasattr(player, 'on_event'):
+        game.add_observer(player)
+    return game, stats
+
+
+def _play_rounds(game: Game, num_hands: int, verbose: bool, first_hand: int = 0) -> bool:
+    for hand_num in range(first_hand, first_hand + num_hands):
+        outcome = game.play_round()
+        if outcome.get("outcome") == "broke":
+            if verbose:
+                print(f"{repr(game.player)} broke at hand {hand_num}")
+            return False
+    return True
+
+
+def _play_hands(
+    player: Player,
+    rules: HouseRules,
+    num_hands: int,
+    base_bet: int,
+    verbose: bool,
+    rng: Optional[random.Random] = None,
+    streaming: bool = False,
+    profile: bool = False,
+    first_hand: int = 0,
+) -> SimulationStatistics:
+    game, stats = _setup_game(player, rules, base_bet, rng, streaming, profile)
+    stats._offset = first_hand
+    _play_rounds(game, num_hands, verbose, first_hand)
+    return stats
+
+
+def _play_chunk(job: tuple) -> SimulationStatistics:
+    return _play_hands(*job)
 
 
 def run_sim(
@@ -74,32 +319,167 @@ def run_sim(
     num_hands: int = 1000,
     base_bet: int = 5,
     verbose: bool = False,
+    seed: Optional[int] = None,
+    processes: Optional[int] = None,
+    streaming: bool = False,
+    profile: bool = False,
 ) -> list[dict[str, Union[int, float, list]]]:
     if rules is None:
         rules = HouseRules()
-    
+
+    chunks = max(1, processes or 1)
+    if seed is not None or chunks > 1:
+        rngs = spawn_rngs(seed, len(players) * chunks)
+    else:
+        rngs = [None] * len(players)
+
+    if chunks == 1:
+        return [
+            _play_hands(player, rules, num_hands, base_bet, verbose, rng, streaming, profile).get_results(
+                player_name=repr(player)
+            )
+            for player, rng in zip(players, rngs)
+        ]
+
+    # Workers play copies of the players, so anything a player learns is lost;
+    # counters start each chunk fresh, which matches the fresh shoe each chunk deals
+    learners = [player for player in players if getattr(player, "training_mode", False)]
+    if learners:
+        raise ValueError(f"{learners[0]!r} is training and must run with processes=1")
+
+    # Each player's hands are split into one chunk per process, each chunk with its own stream
+    sizes = [num_hands // chunks + (1 if i < num_hands % chunks else 0) for i in range(chunks)]
+    starts = [sum(sizes[:c]) for c in range(chunks)]
+    jobs = [
+        (player, rules, size, base_bet, verbose, rngs[p * chunks + c], streaming, profile, starts[c])
+        for p, player in enumerate(players)
+        for c, size in enumerate(sizes)
+    ]
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        chunk_stats = list(pool.map(_play_chunk, jobs))
+
     results = []
-    for player in players:
-        game = Game(player=player, rules=rules, bet=base_bet)
-        stats = SimulationStatistics()
-        stats.starting_bankroll = player.bankroll
-        
-        game.add_observer(stats)
-        if hasattr(player, 'on_event'):
-            game.add_observer(player)
-        
-        for hand_num in range(num_hands):
-            outcome = game.play_round()
-            if outcome.get("outcome") == "broke":
-                if verbose:
-                    print(f"{repr(player)} broke at hand {hand_num}")
+    for p, player in enumerate(players):
+        stats = chunk_stats[p * chunks]
+        for c in range(1, chunks):
+            if stats._broke:
                 break
-        
+            chunk = chunk_stats[p * chunks + c]
+            # A chunk is shifted onto the bankroll the previous ones ended with.
+            # Where either bankroll gets low enough to refuse a bet or a double
+            # the shift is wrong, so the chunk is replayed on its own stream
+            # from the real bankroll instead
+            offset = stats.final_bankroll - chunk.starting_bankroll
+            floor = 2 * max(stats._max_stake, chunk._max_stake)
+            if chunk._broke or min(chunk.min_bankroll, chunk.min_bankroll + offset) < floor:
+                replay = copy.deepcopy(player)
+                replay.bankroll = stats.final_bankroll
+                chunk = _play_hands(
+                    replay, rules, sizes[c], base_bet, verbose, rngs[p * chunks + c], streaming, profile, starts[c]
+                )
+            stats = stats.merge(chunk)
+        player.bankroll = stats.final_bankroll
         results.append(stats.get_results(player_name=repr(player)))
-    
+
+    return results
+
+
+def ev_interval(
+    profit_mean: float, profit_std: float, hands: int, base_bet: int, confidence: float = 0.95
+) -> tuple[float, float, float]:
+    ev = profit_mean / base_bet
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    half_width = z * profit_std / base_bet / max(hands, 1) ** 0.5
+    return ev, ev - half_width, ev + half_width
+
+
+def run_sim_until(
+    players: list[Player],
+    rules: HouseRules = None,
+    tolerance: float = 0.01,
+    confidence: float = 0.95,
+    max_hands: int = 10_000_000,
+    chunk_size: int = 10_000,
+    base_bet: int = 5,
+    verbose: bool = False,
+    seed: Optional[int] = None,
+) -> list[dict[str, Union[int, float, list]]]:
+    if rules is None:
+        rules = HouseRules()
+    if chunk_size <= 0:
+        raise ValueError(f"chunk_size must be positive, got {chunk_size}")
+
+    rngs = spawn_rngs(seed, len(players)) if seed is not None else [None] * len(players)
+    results = []
+    for player, rng in zip(players, rngs):
+        game, stats = _setup_game(player, rules, base_bet, rng, streaming=True)
+
+        # Plays chunks until the interval on EV per unit bet is within
+        # +/- tolerance, the budget runs out or the player goes broke
+        converged = False
+        played = 0
+        while played < max_hands:
+            size = min(chunk_size, max_hands - played)
+            active = _play_rounds(game, size, verbose, played)
+            played += size
+            _, low, high = ev_interval(
+                stats.profit_mean, stats.profit_variance ** 0.5, stats.total_hands, base_bet, confidence
+            )
+            if stats.total_hands > 1 and (high - low) / 2 <= tolerance:
+                converged = True
+                break
+            if not active:
+                break
+
+        ev, low, high = ev_interval(
+            stats.profit_mean, stats.profit_variance ** 0.5, stats.total_hands, base_bet, confidence
+        )
+        result = stats.get_results(player_name=repr(player))
+        result.update({
+            "hands_used": stats.total_hands,
+            "converged": converged,
+            "ev_per_unit": ev,
+            "ev_ci_low": low,
+            "ev_ci_high": high,
+            "confidence": confidence,
+        })
+        results.append(result)
+
     return results
 
 
+def iter_sim(
+    players: list[Player],
+    rules: HouseRules = None,
+    num_hands: int = 1000,
+    base_bet: int = 5,
+    verbose: bool = False,
+    seed: Optional[int] = None,
+    snapshot_every: int = 1000,
+    streaming: bool = True,
+) -> Iterator[list[SimulationStatistics]]:
+    if rules is None:
+        rules = HouseRules()
+
+    rngs = spawn_rngs(seed, len(players)) if seed is not None else [None] * len(players)
+    tables = [
+        _setup_game(player, rules, base_bet, rng, streaming)
+        for player, rng in zip(players, rngs)
+    ]
+
+    # Players take turns playing a block of hands so every snapshot covers the
+    # same number of hands for each of them; stopping the iteration stops the run
+    active = [True] * len(players)
+    for start in range(0, num_hands, snapshot_every):
+        size = min(snapshot_every, num_hands - start)
+        for p, (game, _) in enumerate(tables):
+            if active[p]:
+                active[p] = _play_rounds(game, size, verbose, start)
+        yield [stats.snapshot() for _, stats in tables]
+        if not any(active):
+            return
+
+
 def print_results(results: list[dict]) -> None:
     for r in results:
         print(f"\n{'='*60}")
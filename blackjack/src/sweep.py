@@ -0,0 +1,190 @@
+from typing import Callable, Iterable, Optional, Union
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import fields
+from itertools import product
+import hashlib
+import json
+import os
+import time
+import numpy as np
+from . import players as player_mod
+from .rules import HouseRules
+from .simulation import ev_interval, run_sim
+
+RULE_FIELDS = tuple(f.name for f in fields(HouseRules))
+RULE_DEFAULTS = {f.name: f.default for f in fields(HouseRules)}
+SWEEP_DEFAULTS = {
+    "player": "BasicStrategyPlayer",
+    "num_hands": 100_000,
+    "base_bet": 5,
+    "bankroll": 1_000_000,
+    "seed": 0,
+}
+STAT_COLUMNS = (
+    "hands",
+    "wins",
+    "losses",
+    "pushes",
+    "doubles",
+    "win_rate",
+    "net_profit",
+    "ev_per_unit",
+    "ev_std",
+    "ev_ci_low",
+    "ev_ci_high",
+    "max_drawdown",
+    "seconds",
+)
+
+Config = dict[str, Union[str, int, float, bool]]
+
+
+def expand_grid(grid: dict[str, Iterable]) -> list[Config]:
+    unknown = set(grid) - set(RULE_FIELDS) - set(SWEEP_DEFAULTS)
+    if unknown:
+        raise ValueError(f"Unknown sweep parameters: {', '.join(sorted(unknown))}")
+    keys = list(grid)
+    # Every rule is filled in before hashing, so a cell that only differs from
+    # another by spelling out a default gets the same cell_id
+    return [
+        {**RULE_DEFAULTS, **SWEEP_DEFAULTS, **dict(zip(keys, values))}
+        for values in product(*(list(grid[key]) for key in keys))
+    ]
+
+
+def cell_id(config: Config) -> str:
+    encoded = json.dumps(config, sort_keys=True).encode()
+    return hashlib.sha256(encoded).hexdigest()[:16]
+
+
+def run_cell(config: Config, confidence: float = 0.95) -> dict[str, Union[int, float]]:
+    rules = HouseRules(**{key: value for key, value in config.items() if key in RULE_FIELDS})
+    player = getattr(player_mod, config["player"])(bankroll=config["bankroll"])
+
+    start = time.perf_counter()
+    result = run_sim(
+        [player],
+        rules=rules,
+        num_hands=config["num_hands"],
+        base_bet=config["base_bet"],
+        seed=config["seed"],
+        streaming=True,
+    )[0]
+    seconds = time.perf_counter() - start
+
+    hands = result["total_games"]
+    ev, low, high = ev_interval(
+        result["profit_mean"], result["profit_std"], hands, config["base_bet"], confidence
+    )
+    return {
+        "hands": hands,
+        "wins": result["wins"],
+        "losses": result["losses"],
+        "pushes": result["pushes"],
+        "doubles": result["doubles"],
+        "win_rate": result["win_rate"],
+        "net_profit": result["net_profit"],
+        "ev_per_unit": ev,
+        "ev_std": result["profit_std"] / config["base_bet"],
+        "ev_ci_low": low,
+        "ev_ci_high": high,
+        "max_drawdown": result["max_drawdown"],
+        "seconds": seconds,
+    }
+
+
+def _run_job(job: tuple[str, Config, float]) -> tuple[str, Config, dict]:
+    key, config, confidence = job
+    return key, config, run_cell(config, confidence)
+
+
+class SweepStore:
+    # One row per configuration, stored column-wise in an .npz file. The config
+    # is kept as JSON next to one column per parameter so rows survive grids
+    # that add or drop parameters between runs
+    def __init__(self, path: str):
+        self.path = path
+        self.rows: dict[str, tuple[Config, dict]] = {}
+        if os.path.exists(path):
+            self._load()
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.rows
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def _load(self) -> None:
+        with np.load(self.path, allow_pickle=False) as data:
+            columns = {name: data[name].tolist() for name in data.files}
+        for i, key in enumerate(columns["cell_id"]):
+            config = json.loads(columns["config"][i])
+            self.rows[key] = (config, {name: columns[name][i] for name in STAT_COLUMNS})
+
+    def add(self, key: str, config: Config, stats: dict) -> None:
+        self.rows[key] = (config, stats)
+
+    def columns(self) -> dict[str, np.ndarray]:
+        configs = [config for config, _ in self.rows.values()]
+        params = sorted({name for config in configs for name in config})
+        columns = {
+            "cell_id": np.array(list(self.rows), dtype=str),
+            "config": np.array([json.dumps(config, sort_keys=True) for config in configs], dtype=str),
+        }
+        for name in params:
+            values = [config.get(name) for config in configs]
+            if all(isinstance(value, (int, float)) for value in values):
+                columns[name] = np.array(values, dtype=float)
+            else:
+                # Text, mixed or missing values; the exact config is still in "config"
+                columns[name] = np.array(["" if value is None else str(value) for value in values], dtype=str)
+        for name in STAT_COLUMNS:
+            columns[name] = np.array([stats[name] for _, stats in self.rows.values()], dtype=float)
+        return columns
+
+    def save(self) -> None:
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Written to a temporary file first so an interrupted save keeps the old results
+        temporary = self.path + ".tmp.npz"
+        np.savez(temporary, **self.columns())
+        os.replace(temporary, self.path)
+
+
+def run_sweep(
+    grid: dict[str, Iterable],
+    path: str,
+    processes: Optional[int] = None,
+    confidence: float = 0.95,
+    checkpoint_every: int = 10,
+    progress: Optional[Callable[[int, int], None]] = None,
+) -> SweepStore:
+    store = SweepStore(path)
+    jobs = []
+    for config in expand_grid(grid):
+        key = cell_id(config)
+        if key not in store:
+            jobs.append((key, config, confidence))
+
+    total = len(jobs)
+    if not jobs:
+        return store
+
+    done = 0
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        futures = [pool.submit(_run_job, job) for job in jobs]
+        try:
+            for future in as_completed(futures):
+                store.add(*future.result())
+                done += 1
+                if progress is not None:
+                    progress(done, total)
+                if done % checkpoint_every == 0:
+                    store.save()
+        finally:
+            # Cells finished before an interruption are kept and skipped on the next run
+            for future in futures:
+                future.cancel()
+            store.save()
+    return store
@@ -0,0 +1,279 @@
+from typing import Iterable, Literal, Optional, Union
+from functools import partial
+import random
+from .card import CARDS
+from .events import (
+    GameEvent,
+    CardDealtEvent,
+    ShoeReshuffledEvent,
+    DoubleDownEvent,
+    RoundEndEvent,
+    RoundRecord,
+    GameObserver,
+    DEFAULT_EVENTS,
+    EVENT_TYPES,
+)
+from .game import Outcome, dealer_should_hit, natural_outcome, play_player_hand, settlement, showdown
+from .hand import Hand
+from .players.base import Player
+from .rules import HouseRules
+from .shoe import Shoe, make_shoe
+from .simulation import SimulationStatistics, spawn_rngs
+
+MAX_SEATS = 7
+
+# Dealt cards and reshuffles are seen by everyone at the table; the other
+# events belong to one seat and only reach that seat's observers
+TABLE_EVENTS = (CardDealtEvent, ShoeReshuffledEvent)
+
+
+class Table:
+    def __init__(
+        self,
+        rules: HouseRules,
+        players: list[Player],
+        bet: int,
+        rng: Optional[random.Random] = None,
+    ):
+        if not 1 <= len(players) <= MAX_SEATS:
+            raise ValueError(f"A table seats 1 to {MAX_SEATS} players, got {len(players)}")
+        self.rules: HouseRules = rules
+        self.players: list[Player] = list(players)
+        self.rng: random.Random = rng if rng is not None else random.Random()
+        self.shoe: Shoe = make_shoe(self.rules, self.rng)
+        self.base_bet: int = bet
+        self.bets: list[int] = [bet] * len(players)
+        self.seated: list[bool] = [True] * len(players)
+        self.doubled: list[bool] = [False] * len(players)
+        self._subscriptions: list[tuple[GameObserver, Optional[int], tuple[type[GameEvent], ...]]] = []
+        self._table_dispatch: dict[type[GameEvent], list[GameObserver]] = {}
+        self._seat_dispatch: list[dict[type[GameEvent], list[GameObserver]]] = []
+        self._reshuffled: bool = False
+        self._in_play: list[Hand] = []
+        self._rebuild_dispatch()
+
+    def add_observer(
+        self,
+        observer: GameObserver,
+        seat: Optional[int] = None,
+        events: Optional[Iterable[type[GameEvent]]] = None,
+    ) -> None:
+        if events is None:
+            events = getattr(observer, "subscribed_events", DEFAULT_EVENTS)
+        self._subscriptions.append((observer, seat, tuple(events)))
+        self._rebuild_dispatch()
+
+    def remove_observer(self, observer: GameObserver) -> None:
+        self._subscriptions = [sub for sub in self._subscriptions if sub[0] is not observer]
+        self._rebuild_dispatch()
+
+    def _rebuild_dispatch(self) -> None:
+        self._table_dispatch = {
+            event_type: [obs for obs, _, events in self._subscriptions if issubclass(event_type, events)]
+            for event_type in TABLE_EVENTS
+        }
+        # Table-wide observers (seat None) also receive every seat's events
+        self._seat_dispatch = [
+            {
+                event_type: [
+                    obs
+                    for obs, seat, events in self._subscriptions
+                    if seat in (None, index) and issubclass(event_type, events)
+                ]
+                for event_type in EVENT_TYPES
+            }
+            for index in range(len(self.players))
+        ]
+
+    def _notify(self, observers: list[GameObserver], event: GameEvent) -> None:
+        for observer in observers:
+            observer.on_event(event)
+
+    def _deal_card(self, hand: Hand, recipient: Literal["player", "dealer"]) -> None:
+        if self.shoe.cursor >= self.shoe.size:
+            self._reshuffle_mid_round()
+        code = self.shoe.draw()
+        hand.add_code(code)
+        if self._table_dispatch[CardDealtEvent]:
+            self._notify(self._table_dispatch[CardDealtEvent], CardDealtEvent(card=CARDS[code], recipient=recipient))
+
+    def _shuffle(self) -> None:
+        self.shoe.shuffle()
+        self._reshuffled = True
+        if self._table_dispatch[ShoeReshuffledEvent]:
+            self._notify(
+                self._table_dispatch[ShoeReshuffledEvent],
+                ShoeReshuffledEvent(num_decks=self.rules.num_decks),
+            )
+
+    def _check_reshuffle(self) -> None:
+        if self.shoe.needs_reshuffle:
+            self._shuffle()
+
+    def _reshuffle_mid_round(self) -> None:
+        # A full table can run through the shoe before the round is over; the
+        # discards are shuffled back in while the cards on the table stay out
+        self._shuffle()
+        self.shoe.withhold([code for hand in self._in_play for code in hand.codes])
+        if self.shoe.cursor >= self.shoe.size:
+            raise RuntimeError("The cards on the table use up the whole shoe")
+
+    def _deal(self, seats: list[int]) -> tuple[dict[int, Hand], Hand]:
+        hands = {seat: Hand() for seat in seats}
+        dealer_hand = Hand()
+        self._in_play = [*hands.values(), dealer_hand]
+        for seat in seats:
+            self._deal_card(hands[seat], "player")
+        self._deal_card(dealer_hand, "dealer")
+        for seat in seats:
+            self._deal_card(hands[seat], "player")
+        self._deal_card(dealer_hand, "dealer")
+        return hands, dealer_hand
+
+    def _double_down(self, seat: int) -> None:
+        self.doubled[seat] = True
+        if self.players[seat].bankroll < self.bets[seat] * 2:
+            return
+        original_bet = self.bets[seat]
+        self.bets[seat] *= 2
+        observers = self._seat_dispatch[seat][DoubleDownEvent]
+        if observers:
+            self._notify(observers, DoubleDownEvent(original_bet=original_bet, new_bet=self.bets[seat]))
+
+    def _player_turn(self, seat: int, player_hand: Hand, dealer_hand: Hand) -> Optional[Outcome]:
+        result = natural_outcome(player_hand, dealer_hand)
+        if result is not None:
+            return result
+        return play_player_hand(
+            self.players[seat],
+            player_hand,
+            dealer_hand,
+            self.rules,
+            self._deal_card,
+            partial(self._double_down, seat),
+        )
+
+    def _dealer_turn(self, dealer_hand: Hand) -> None:
+        while dealer_should_hit(dealer_hand, self.rules):
+            self._deal_card(dealer_hand, "dealer")
+
+    def _round_result(
+        self,
+        seat: int,
+        result: Outcome,
+        player_hand: Optional[Hand],
+        dealer_hand: Optional[Hand],
+    ) -> dict[str, Union[str, Hand, None, float]]:
+        player = self.players[seat]
+        bet = self.bets[seat]
+        player.bankroll += settlement(result, bet, self.rules)
+
+        dispatch = self._seat_dispatch[seat]
+        if dispatch[RoundRecord]:
+            self._notify(dispatch[RoundRecord], RoundRecord(
+                player_cards=bytes(player_hand.codes) if player_hand else b"",
+                dealer_cards=bytes(dealer_hand.codes) if dealer_hand else b"",
+                bet=bet,
+                outcome=result,
+                bankroll=player.bankroll,
+                reshuffled=self._reshuffled,
+                doubled=self.doubled[seat],
+                player_total=player_hand.best_total if player_hand else 0,
+                dealer_total=dealer_hand.best_total if dealer_hand else 0,
+            ))
+        self.bets[seat] = self.base_bet
+        self.doubled[seat] = False
+        if dispatch[RoundEndEvent]:
+            self._notify(dispatch[RoundEndEvent], RoundEndEvent(
+                outcome=result,
+                player_hand=player_hand,
+                dealer_hand=dealer_hand,
+                bankroll=player.bankroll,
+            ))
+
+        return {
+            "outcome": result,
+            "player": player_hand,
+            "dealer": dealer_hand,
+            "bankroll": player.bankroll,
+        }
+
+    def play_round(self) -> list[Optional[dict[str, Union[str, Hand, None, float]]]]:
+        # One result per seat; seats that have left the table get None
+        results: list[Optional[dict]] = [None] * len(self.players)
+        self._reshuffled = False
+        self._check_reshuffle()
+
+        seats = []
+        for seat, player in enumerate(self.players):
+            if not self.seated[seat]:
+                continue
+            self.bets[seat] = player.decide_bet_amount(curr_bet_unit=self.base_bet, shoe_length=len(self.shoe))
+            if player.bankroll < self.bets[seat]:
+                # A broke player leaves the table
+                self.seated[seat] = False
+                results[seat] = self._round_result(seat, "broke", None, None)
+            else:
+                seats.append(seat)
+        if not seats:
+            return results
+
+        hands, dealer_hand = self._deal(seats)
+
+        # The dealer's hand is only played out if some seat is still standing
+        standing = []
+        for seat in seats:
+            result = self._player_turn(seat, hands[seat], dealer_hand)
+            if result:
+                results[seat] = self._round_result(seat, result, hands[seat], dealer_hand)
+            else:
+                standing.append(seat)
+
+        if standing and not dealer_hand.is_blackjack:
+            self._dealer_turn(dealer_hand)
+        for seat in standing:
+            results[seat] = self._round_result(
+                seat, showdown(hands[seat], dealer_hand), hands[seat], dealer_hand
+            )
+
+        return results
+
+
+def run_table_sim(
+    players: list[Player],
+    rules: HouseRules = None,
+    num_hands: int = 1000,
+    base_bet: int = 5,
+    verbose: bool = False,
+    seed: Optional[int] = None,
+    streaming: bool = False,
+) -> list[dict[str, Union[int, float, list]]]:
+    if rules is None:
+        rules = HouseRules()
+
+    rngs = spawn_rngs(seed, len(players) + 1) if seed is not None else [None] * (len(players) + 1)
+    for player, rng in zip(players, rngs[1:]):
+        if rng is not None:
+            player.rng = rng
+    table = Table(rules=rules, players=players, bet=base_bet, rng=rngs[0])
+
+    seat_stats = []
+    for seat, player in enumerate(players):
+        stats = SimulationStatistics(streaming=streaming)
+        stats.starting_bankroll = player.bankroll
+        table.add_observer(stats, seat=seat)
+        if hasattr(player, "on_event"):
+            table.add_observer(player, seat=seat)
+        seat_stats.append(stats)
+
+    for hand_num in range(num_hands):
+        for seat, result in enumerate(table.play_round()):
+            if verbose and result is not None and result["outcome"] == "broke":
+                print(f"{repr(players[seat])} broke at hand {hand_num}")
+        if not any(table.seated):
+            break
+
+    return [
+        stats.get_results(player_name=repr(player))
+        for player, stats in zip(players, seat_stats)
+    ]
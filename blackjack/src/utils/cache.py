@@ -0,0 +1,86 @@
+from typing import Callable, Generic, Hashable, Iterable, Iterator, Optional, TypeVar
+from collections import OrderedDict
+import threading
+
+T = TypeVar("T")
+
+
+class ResultCache(Generic[T]):
+    def __init__(self, max_entries: int = 32):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[Hashable, T] = OrderedDict()
+        self._in_flight: dict[Hashable, threading.Event] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._entries
+
+    def get(self, key: Hashable) -> Optional[T]:
+        with self._lock:
+            if key not in self._entries:
+                return None
+            self._entries.move_to_end(key)
+            return self._entries[key]
+
+    def put(self, key: Hashable, value: T) -> None:
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _claim(self, key: Hashable) -> tuple[bool, Optional[T]]:
+        # Returns (True, value) on a hit. Otherwise waits out any caller already
+        # computing the key and returns (False, None) once this caller owns it
+        while True:
+            with self._lock:
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                    return True, self._entries[key]
+                event = self._in_flight.get(key)
+                if event is None:
+                    self._in_flight[key] = threading.Event()
+                    return False, None
+            event.wait()
+
+    def _release(self, key: Hashable) -> None:
+        with self._lock:
+            self._in_flight.pop(key).set()
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], T]) -> T:
+        # Concurrent callers asking for the same key wait for the first one
+        # instead of computing it again
+        hit, value = self._claim(key)
+        if hit:
+            return value
+        try:
+            value = compute()
+            self.put(key, value)
+            return value
+        finally:
+            self._release(key)
+
+    def get_or_stream(self, key: Hashable, stream: Callable[[], Iterable[T]]) -> Iterator[T]:
+        # Like get_or_compute, but passes on each partial value as it comes and
+        # caches the last one. A stream abandoned part way caches nothing, and a
+        # waiting caller computes it instead
+        hit, value = self._claim(key)
+        if hit:
+            yield value
+            return
+        try:
+            value = None
+            for value in stream():
+                yield value
+            if value is not None:
+                self.put(key, value)
+        finally:
+            self._release(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,71 @@
+from typing import Optional
+from dataclasses import asdict
+import json
+import os
+import struct
+import numpy as np
+from ..rules import HouseRules
+
+# Layout: magic, version, header length, JSON header padded so the arrays
+# start on a 64-byte boundary, float64 Q-values, then the uint8 visited mask
+MAGIC = b"BJQTAB\x00\x00"
+FORMAT_VERSION = 1
+_PREFIX = struct.Struct("<8sII")
+_ALIGNMENT = 64
+
+MODEL_EXTENSION = ".qtab"
+
+
+def is_model_file(filepath: str) -> bool:
+    with open(filepath, "rb") as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+def save_q_model(
+    filepath: str,
+    q_values: np.ndarray,
+    q_visited: np.ndarray,
+    hyperparameters: dict,
+    rules: Optional[HouseRules] = None,
+) -> None:
+    header = {
+        "shape": list(q_values.shape),
+        "hyperparameters": hyperparameters,
+        "rules": asdict(rules) if rules is not None else None,
+        "rules_fingerprint": rules.fingerprint() if rules is not None else None,
+        "states_learned": int(q_visited.sum()),
+    }
+    encoded = json.dumps(header, sort_keys=True).encode()
+    padding = -(_PREFIX.size + len(encoded)) % _ALIGNMENT
+    encoded += b" " * padding
+
+    directory = os.path.dirname(filepath)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(filepath, "wb") as f:
+        f.write(_PREFIX.pack(MAGIC, FORMAT_VERSION, len(encoded)))
+        f.write(encoded)
+        f.write(np.ascontiguousarray(q_values, dtype="<f8").tobytes())
+        f.write(np.ascontiguousarray(q_visited, dtype=np.uint8).tobytes())
+
+
+def read_header(filepath: str) -> tuple[dict, int]:
+    with open(filepath, "rb") as f:
+        magic, version, header_length = _PREFIX.unpack(f.read(_PREFIX.size))
+        if magic != MAGIC:
+            raise ValueError(f"{filepath} is not a Q-learning model file")
+        if version != FORMAT_VERSION:
+            raise ValueError(f"Unsupported model format version {version} in {filepath}")
+        header = json.loads(f.read(header_length))
+    return header, _PREFIX.size + header_length
+
+
+def load_q_model(filepath: str) -> tuple[np.ndarray, np.ndarray, dict]:
+    header, offset = read_header(filepath)
+    shape = tuple(header["shape"])
+    q_values = np.memmap(filepath, dtype="<f8", mode="r", offset=offset, shape=shape)
+    q_visited = np.memmap(
+        filepath, dtype=np.bool_, mode="r", offset=offset + q_values.nbytes, shape=shape
+    )
+    return q_values, q_visited, header
+
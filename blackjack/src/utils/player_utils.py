@@ -1,19 +1,67 @@
+from dataclasses import dataclass
+from ..card import Card, RANKS, RANK_VALUE_INDEX
+from ..hand import Hand
+
+RESULT_MAP = {
+    "h": "hit",
+    "s": "stand",
+    "d": "double",
+    "r": "surrender",
+}
+
+# Action order of StrategyTable.codes
+ACTIONS = ("stand", "hit", "double", "surrender")
+
+MAX_TOTAL = 21
+NUM_DEALER_INDICES = 10
+
+
 def map_result_char(c: str) -> str:
-    RESULT_MAP = {
-        "h": "hit",
-        "s": "stand",
-        "d": "double",
-        "r": "surrender",
-    }
     return RESULT_MAP[c]
 
 def get_dealer_index(card_val: str) -> int:
-    if card_val == "A":
-        return 9
-    elif card_val in {"10", "J", "Q", "K"}:
-        return 8
-    else:
-        return int(card_val) - 2
+    return RANK_VALUE_INDEX[RANKS.index(card_val)]
+
+def strategy_index(total: int, soft: bool, dealer_index: int) -> int:
+    return (total * 2 + soft) * NUM_DEALER_INDICES + dealer_index
+
+
+@dataclass(frozen=True)
+class StrategyTable:
+    actions: tuple[str, ...]
+    codes: bytes
+
+    def lookup(self, hand: Hand, dealer_up: Card) -> str:
+        return self.actions[strategy_index(hand.best_total, hand.is_soft, dealer_up.value_index)]
+
+
+def _chart_row(matrix: list[list[str]], offset: int, total: int) -> list[str]:
+    row = total - offset
+    if row < 0:
+        return ["h"] * NUM_DEALER_INDICES
+    if row >= len(matrix):
+        return ["s"] * NUM_DEALER_INDICES
+    return matrix[row]
+
+
+def compile_strategy(
+    hard: list[list[str]],
+    soft: list[list[str]] = None,
+    hard_offset: int = 4,
+    soft_offset: int = 13,
+) -> StrategyTable:
+    if soft is None:
+        soft, soft_offset = hard, hard_offset
+
+    actions = []
+    for total in range(MAX_TOTAL + 1):
+        for matrix, offset in ((hard, hard_offset), (soft, soft_offset)):
+            actions.extend(RESULT_MAP[c] for c in _chart_row(matrix, offset, total))
+
+    return StrategyTable(
+        actions=tuple(actions),
+        codes=bytes(ACTIONS.index(action) for action in actions),
+    )
 
 BASIC_MATRIX = [
     # 2,   3,   4,   5,   6,   7,   8,   9,  10,  'A'
@@ -71,3 +119,6 @@ SOFT_MATRIX = [
     ["s", "s", "s", "s", "s", "s", "s", "s", "s", "s"],  # 20
     ["s", "s", "s", "s", "s", "s", "s", "s", "s", "s"],  # 21
 ]
+
+BASIC_STRATEGY = compile_strategy(BASIC_MATRIX)
+CHART_STRATEGY = compile_strategy(HARD_MATRIX, SOFT_MATRIX)
@@ -7,12 +7,13 @@ from src.players.learning import QLearningPlayer
 
 
 def main():
+    rules = HouseRules()
     q_player = QLearningPlayer(bankroll=1000, training_mode=False)
-    q_player.load_model("_models/q_learning_player.pkl")
+    q_player.load_model("_models/q_learning_player.qtab", rules=rules)
     
     results = run_sim(
         players=[ChartPlayer2(bankroll=1000), q_player],
-        rules=HouseRules(),
+        rules=rules,
         num_hands=100000,
         base_bet=5,
         verbose=True,
@@ -0,0 +1,114 @@
+import copy
+import random
+from src.events import RoundEndEvent
+from src.players.chart import ChartPlayer2
+from src.players.counting import CountingPlayer
+from src.players.learning import QLearningPlayer
+from src.simulation import SimulationStatistics, _play_hands, run_sim, spawn_rngs
+from src.game import Game
+from src.rules import HouseRules
+
+# Usage (from blackjack/):
+#   python -m test.merge_check
+
+
+class Recorder:
+    subscribed_events = (RoundEndEvent,)
+
+    def __init__(self):
+        self.events = []
+
+    def on_event(self, event):
+        self.events.append(event)
+
+
+def record_events(num_hands: int, seed: int) -> tuple[float, list[RoundEndEvent]]:
+    player = ChartPlayer2(bankroll=10**6)
+    game = Game(rules=HouseRules(), player=player, bet=5, rng=random.Random(seed))
+    recorder = Recorder()
+    game.add_observer(recorder)
+    for _ in range(num_hands):
+        game.play_round()
+    return 10**6, recorder.events
+
+
+def check_merge_matches_serial(num_hands: int, chunks: int, seed: int) -> None:
+    starting, events = record_events(num_hands, seed)
+
+    serial = SimulationStatistics(streaming=True, starting_bankroll=starting)
+    for event in events:
+        serial.on_event(event)
+
+    # The same rounds split into chunks, each starting from the previous chunk's bankroll
+    sizes = [num_hands // chunks + (1 if i < num_hands % chunks else 0) for i in range(chunks)]
+    parts = []
+    start = 0
+    for size in sizes:
+        stats = SimulationStatistics(
+            streaming=True,
+            starting_bankroll=events[start - 1].bankroll if start else starting,
+            _offset=start,
+        )
+        for event in events[start:start + size]:
+            stats.on_event(event)
+        parts.append(stats)
+        start += size
+    merged = SimulationStatistics.reduce(parts)
+
+    expected = serial.get_results("serial")
+    actual = merged.get_results("merged")
+    for key in ("bankroll_history", "cum_winrate", "final_bankroll", "total_games", "max_drawdown"):
+        assert expected[key] == actual[key], f"{key} differs for {num_hands} hands in {chunks} chunks"
+    assert abs(expected["profit_mean"] - actual["profit_mean"]) < 1e-9
+
+
+def check_parallel_tail() -> None:
+    result = run_sim([ChartPlayer2(10**6)], num_hands=100_000, seed=3, processes=4, streaming=True)[0]
+    assert result["bankroll_history"][-1] == result["final_bankroll"]
+
+
+def check_parallel_matches_chained_chunks(player, num_hands: int, processes: int, seed: int) -> None:
+    # Each chunk played in turn on its own stream, from a fresh copy of the
+    # player holding the bankroll the previous chunk ended with
+    sizes = [num_hands // processes + (1 if i < num_hands % processes else 0) for i in range(processes)]
+    rngs = spawn_rngs(seed, processes)
+    stats = None
+    start = 0
+    for size, rng in zip(sizes, rngs):
+        chunk_player = copy.deepcopy(player)
+        if stats is not None:
+            chunk_player.bankroll = stats.final_bankroll
+        chunk = _play_hands(chunk_player, HouseRules(), size, 5, False, rng, True, False, start)
+        stats = chunk if stats is None else stats.merge(chunk)
+        start += size
+        if stats._broke:
+            break
+
+    expected = stats.get_results("chained")
+    actual = run_sim([player], num_hands=num_hands, seed=seed, processes=processes, streaming=True)[0]
+    for key in ("bankroll_history", "cum_winrate", "final_bankroll", "total_games", "wins", "min_bankroll"):
+        assert expected[key] == actual[key], f"{key} differs for {player!r} over {processes} processes"
+    assert actual["final_bankroll"] >= 0
+
+
+def check_learners_stay_serial() -> None:
+    try:
+        run_sim([QLearningPlayer(training_mode=True)], num_hands=100, seed=0, processes=2)
+    except ValueError:
+        return
+    raise AssertionError("a training player ran in worker copies")
+
+
+def main():
+    for num_hands, chunks in ((10_000, 4), (12_345, 3), (50_001, 7), (3_999, 2)):
+        check_merge_matches_serial(num_hands, chunks, seed=num_hands)
+    check_parallel_tail()
+    check_parallel_matches_chained_chunks(ChartPlayer2(bankroll=300), 40_000, 4, seed=5)
+    check_parallel_matches_chained_chunks(ChartPlayer2(bankroll=2_000), 200_000, 4, seed=7)
+    check_parallel_matches_chained_chunks(CountingPlayer(bankroll=10**6), 100_000, 3, seed=11)
+    check_learners_stay_serial()
+    print("✓ Streaming merges match serial runs")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,261 @@
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+from typing import Callable
+from src.card import CARDS, build_shoe, build_shoe_codes
+from src.game import Game
+from src.hand import Hand
+from src.players import (
+    Player,
+    RandomStrategyPlayer,
+    BasicStrategyPlayer,
+    ChartPlayer1,
+    ChartPlayer2,
+    RCHighLowPlayer,
+    QLearningPlayer,
+)
+from src.rules import HouseRules
+from src.simulation import run_sim
+
+# Usage (from blackjack/):
+#   python -m tools.benchmark --save _benchmarks/baseline.json
+#   python -m tools.benchmark --compare _benchmarks/baseline.json
+
+DEFAULT_BASELINE = "_benchmarks/baseline.json"
+SIM_SIZES = (1_000, 10_000, 100_000)
+QUICK_SIM_SIZES = (1_000, 10_000)
+
+PLAYER_TYPES: dict[str, Callable[[], Player]] = {
+    "random": RandomStrategyPlayer,
+    "basic": BasicStrategyPlayer,
+    "chart1": ChartPlayer1,
+    "chart2": ChartPlayer2,
+    "hilo": RCHighLowPlayer,
+    "qlearning": lambda: QLearningPlayer(training_mode=False, epsilon=0.0),
+}
+
+
+def _time_per_op(run: Callable[[], None], ops: int, repeat: int) -> float:
+    # Best of several runs; the minimum is the least disturbed by other load
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter_ns()
+        run()
+        best = min(best, time.perf_counter_ns() - start)
+    return best / ops
+
+
+def _sample_states(rules: HouseRules, count: int, rng: random.Random) -> list[tuple[Hand, object]]:
+    states = []
+    shoe = build_shoe_codes(rules.num_decks, rng)
+    while len(states) < count:
+        if len(shoe) < 10:
+            shoe = build_shoe_codes(rules.num_decks, rng)
+        hand = Hand((shoe.pop(), shoe.pop()))
+        while hand.best_total < 12 and rng.random() < 0.5:
+            hand.add_code(shoe.pop())
+        if not hand.is_bust and not hand.is_blackjack:
+            states.append((hand, CARDS[shoe.pop()]))
+    return states
+
+
+def bench_hand(scale: int, repeat: int) -> dict[str, float]:
+    rng = random.Random(0)
+    shoe = build_shoe_codes(8, rng)
+    hands = [Hand(shoe[i:i + 3]) for i in range(0, 300, 3)]
+    loops = max(1, scale // len(hands))
+
+    def totals():
+        for _ in range(loops):
+            for hand in hands:
+                hand.totals()
+
+    def best_total():
+        for _ in range(loops):
+            for hand in hands:
+                hand.best_total
+
+    ops = loops * len(hands)
+    return {
+        "hand.totals": _time_per_op(totals, ops, repeat),
+        "hand.best_total": _time_per_op(best_total, ops, repeat),
+    }
+
+
+def bench_shoe(rules: HouseRules, scale: int, repeat: int) -> dict[str, float]:
+    rng = random.Random(0)
+    loops = max(1, scale // 1000)
+    game = Game(rules=rules, player=BasicStrategyPlayer(), bet=5, rng=rng)
+
+    def shoe_cards():
+        for _ in range(loops):
+            build_shoe(rules.num_decks)
+
+    def shoe_codes():
+        for _ in range(loops):
+            build_shoe_codes(rules.num_decks, rng)
+
+    def reshuffle():
+        for _ in range(loops):
+            game.shoe.cursor = game.shoe.size
+            game._check_reshuffle()
+
+    return {
+        "shoe.build_shoe": _time_per_op(shoe_cards, loops, repeat),
+        "shoe.build_shoe_codes": _time_per_op(shoe_codes, loops, repeat),
+        "shoe.reshuffle": _time_per_op(reshuffle, loops, repeat),
+    }
+
+
+def bench_decide_move(rules: HouseRules, scale: int, repeat: int) -> dict[str, float]:
+    states = _sample_states(rules, 1000, random.Random(0))
+    loops = max(1, scale // len(states))
+    results = {}
+    for name, factory in PLAYER_TYPES.items():
+        player = factory()
+        player.rng = random.Random(0)
+
+        def decide(player=player):
+            for _ in range(loops):
+                for hand, dealer_up in states:
+                    player.decide_move(hand, dealer_up, rules)
+
+        results[f"decide_move.{name}"] = _time_per_op(decide, loops * len(states), repeat)
+    return results
+
+
+def bench_play_round(rules: HouseRules, scale: int, repeat: int) -> dict[str, float]:
+    results = {}
+    for name, factory in PLAYER_TYPES.items():
+        player = factory()
+        player.rng = random.Random(0)
+        game = Game(rules=rules, player=player, bet=5, rng=random.Random(0))
+        if hasattr(player, "on_event"):
+            game.add_observer(player)
+
+        def play(game=game, player=player):
+            for _ in range(scale):
+                player.bankroll = 1000
+                game.play_round()
+
+        results[f"play_round.{name}"] = _time_per_op(play, scale, repeat)
+    return results
+
+
+def bench_learn(scale: int, repeat: int) -> dict[str, float]:
+    player = QLearningPlayer(training_mode=True)
+    rng = random.Random(0)
+    episodes = [
+        [(rng.randrange(len(player.q_values)), rng.randrange(2)) for _ in range(rng.randint(1, 3))]
+        for _ in range(1000)
+    ]
+    outcomes = [rng.choice(("win", "loss", "push")) for _ in episodes]
+    loops = max(1, scale // len(episodes))
+
+    def learn():
+        for _ in range(loops):
+            for episode, outcome in zip(episodes, outcomes):
+                player.current_episode = list(episode)
+                player.learn_from_hand(outcome)
+        player.flush_updates()
+
+    return {"learn_from_hand": _time_per_op(learn, loops * len(episodes), repeat)}
+
+
+def bench_run_sim(rules: HouseRules, sizes: tuple[int, ...], repeat: int) -> dict[str, float]:
+    results = {}
+    for size in sizes:
+        def simulate(size=size):
+            run_sim([BasicStrategyPlayer(bankroll=10**9)], rules=rules, num_hands=size, seed=0)
+
+        results[f"run_sim.{size}"] = _time_per_op(simulate, size, max(1, repeat // 2))
+    return results
+
+
+def run_benchmarks(quick: bool = False, only: tuple[str, ...] = ()) -> dict[str, float]:
+    rules = HouseRules()
+    scale = 20_000 if quick else 100_000
+    repeat = 3 if quick else 5
+    groups = {
+        "hand": lambda: bench_hand(scale, repeat),
+        "shoe": lambda: bench_shoe(rules, scale, repeat),
+        "decide_move": lambda: bench_decide_move(rules, scale, repeat),
+        "play_round": lambda: bench_play_round(rules, scale // 5, repeat),
+        "learn_from_hand": lambda: bench_learn(scale, repeat),
+        "run_sim": lambda: bench_run_sim(rules, QUICK_SIM_SIZES if quick else SIM_SIZES, repeat),
+    }
+
+    results = {}
+    for group, bench in groups.items():
+        if only and group not in only:
+            continue
+        for name, ns in bench().items():
+            results[name] = ns
+            print(f"{name:<28} {ns:>14,.1f} ns/op")
+    return results
+
+
+def compare(results: dict[str, float], baseline: dict[str, float], threshold: float) -> list[str]:
+    regressions = []
+    print(f"\n{'benchmark':<28} {'baseline':>12} {'current':>12} {'change':>9}")
+    for name, ns in results.items():
+        if name not in baseline:
+            print(f"{name:<28} {'-':>12} {ns:>12,.1f} {'new':>9}")
+            continue
+        change = ns / baseline[name] - 1
+        mark = ""
+        if change > threshold:
+            mark = "  REGRESSION"
+            regressions.append(name)
+        elif change < -threshold:
+            mark = "  faster"
+        print(f"{name:<28} {baseline[name]:>12,.1f} {ns:>12,.1f} {change:>+8.1%}{mark}")
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the simulator hot paths")
+    parser.add_argument("--save", nargs="?", const=DEFAULT_BASELINE, help="write results as a baseline")
+    parser.add_argument("--compare", nargs="?", const=DEFAULT_BASELINE, help="compare against a baseline")
+    parser.add_argument("--threshold", type=float, default=0.10, help="relative slowdown counted as a regression")
+    parser.add_argument("--quick", action="store_true", help="fewer iterations and smaller run_sim sizes")
+    parser.add_argument("--only", nargs="*", default=(), help="benchmark groups to run")
+    args = parser.parse_args()
+
+    results = run_benchmarks(quick=args.quick, only=tuple(args.only))
+
+    if args.save:
+        directory = os.path.dirname(args.save)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(args.save, "w") as f:
+            json.dump(
+                {
+                    "python": platform.python_version(),
+                    "platform": platform.platform(),
+                    "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                    "unit": "ns/op",
+                    "results": results,
+                },
+                f,
+                indent=2,
+                sort_keys=True,
+            )
+        print(f"\n✓ Baseline saved: {args.save}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n⚠ {len(regressions)} regression(s) above {args.threshold:.0%}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
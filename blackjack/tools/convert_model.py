@@ -0,0 +1,12 @@
+import sys
+from src.players.learning import QLearningPlayer
+from src.rules import HouseRules
+
+
+source = sys.argv[1] if len(sys.argv) > 1 else "_models/q_learning_player.pkl"
+destination = sys.argv[2] if len(sys.argv) > 2 else source.rsplit(".", 1)[0] + ".qtab"
+
+# Pickled models don't record their rules; they were trained on the default HouseRules
+player = QLearningPlayer(training_mode=False)
+player.load_model(source)
+player.save_model(destination, rules=HouseRules())
@@ -12,7 +12,8 @@ player = QLearningPlayer(
     training_mode=True,
 )
 
-game = Game(player=player, rules=HouseRules(), bet=5)
+rules = HouseRules()
+game = Game(player=player, rules=rules, bet=5)
 
 num_episodes = 10_000_000
 start_time = time.time()
@@ -39,8 +40,9 @@ for episode in range(num_episodes):
               f"{len(player.q_table):,} states, ε={player.epsilon:.2f}, "
               f"{(episode + 1) / elapsed:.0f} hands/sec")
 
+player.flush_updates()
 total_time = time.time() - start_time
 print(f"\nTrained {num_episodes:,} episodes in {total_time:.1f}s")
 print(f"Final: {len(player.q_table):,} states, {wins / num_episodes:.2%} win rate")
 
-player.save_model("_models/q_learning_player.pkl")
\ No newline at end of file
+player.save_model("_models/q_learning_player.qtab", rules=rules)
\ No newline at end of file
@@ -0,0 +1,27 @@
+import argparse
+import json
+from src.sweep import run_sweep
+
+# Usage (from blackjack/):
+#   python -m tools.sweep grid.json _sweeps/results.npz --processes 4
+# where grid.json maps HouseRules fields, player, num_hands, base_bet,
+# bankroll or seed to lists of values, e.g.
+#   {"num_decks": [1, 2, 6, 8], "dealer_hits_soft_17": [false, true]}
+
+parser = argparse.ArgumentParser(description="Run a parameter sweep")
+parser.add_argument("grid", help="JSON file mapping parameters to lists of values")
+parser.add_argument("output", help="columnar .npz results file; finished cells are skipped")
+parser.add_argument("--processes", type=int, default=None)
+parser.add_argument("--confidence", type=float, default=0.95)
+args = parser.parse_args()
+
+with open(args.grid) as f:
+    grid = json.load(f)
+
+
+def report(done: int, total: int) -> None:
+    print(f"\r{done:,}/{total:,} cells", end="", flush=True)
+
+
+store = run_sweep(grid, args.output, processes=args.processes, confidence=args.confidence, progress=report)
+print(f"\n✓ {len(store):,} cells in {args.output}")
@@ -4,9 +4,10 @@ from pathlib import Path
 import inspect
 import re
 
-from blackjack.src.simulation import run_sim
+from blackjack.src.simulation import iter_sim
 import blackjack.src.players as player_mod
 from blackjack.src.rules import HouseRules
+from blackjack.src.utils.cache import ResultCache
 
 st.set_page_config(
     page_title="Blackjack Simulation",
@@ -19,11 +20,17 @@ PLAYER_METADATA = {
     "BasicStrategyPlayer": ("Basic Strategy", 2),
     "ChartPlayer1": ("Chart Player 1", 3),
     "ChartPlayer2": ("Chart Player 2", 4),
-    "RCHighLowPlayer": ("Running Count High Low", 5),
-    "QLearningPlayer": ("Q-Learning AI", 6),
+    "RuleChartPlayer": ("Rule-Aware Chart", 5),
+    "RCHighLowPlayer": ("Running Count High Low", 6),
+    "CountingPlayer": ("Card Counting (Hi-Lo)", 7),
+    "QLearningPlayer": ("Q-Learning AI", 8),
 }
 
 
+MODEL_PATH = Path("blackjack/_models/q_learning_player.qtab")
+
+
+@st.cache_resource
 def _build_strategy_options():
     player_classes = [
         cls
@@ -47,22 +54,73 @@ def _build_strategy_options():
     return options
 
 
-STRATEGY_OPTIONS = _build_strategy_options()
-
-STRATEGY_OPTIONS_SORTED = dict(
-    sorted(
-        STRATEGY_OPTIONS.items(),
-        key=lambda item: PLAYER_METADATA.get(item[1].__name__, (0, 0))[1],
-        reverse=False,
+@st.cache_resource
+def _sorted_strategy_options():
+    return dict(
+        sorted(
+            _build_strategy_options().items(),
+            key=lambda item: PLAYER_METADATA.get(item[1].__name__, (0, 0))[1],
+            reverse=False,
+        )
     )
-)
+
+
+@st.cache_resource
+def _load_q_model(model_path: str):
+    model = player_mod.QLearningPlayer(training_mode=False, epsilon=0.0)
+    model.load_model(model_path)
+    return model
+
+
+@st.cache_resource
+def _result_cache():
+    return ResultCache(max_entries=32)
+
+
+def _build_player(strategy):
+    cls = STRATEGY_OPTIONS_SORTED[strategy]
+    if cls.__name__ == "QLearningPlayer":
+        return _load_q_model(str(MODEL_PATH)).clone(bankroll=1000)
+    try:
+        return cls(bankroll=1000)
+    except TypeError:
+        return cls()
+
+
+def _cache_key(strategies, rules_name, num_hands, seed):
+    return (strategies, RULE_OPTIONS[rules_name].fingerprint(), num_hands, seed)
+
+
+def _stream_results(strategies, rules_name, num_hands, seed):
+    players = [_build_player(strategy) for strategy in strategies]
+    for snapshot in iter_sim(
+        players=players,
+        rules=RULE_OPTIONS[rules_name],
+        num_hands=num_hands,
+        seed=seed,
+        snapshot_every=max(SNAPSHOT_MIN_HANDS, num_hands // SNAPSHOT_COUNT),
+    ):
+        yield [
+            stats.get_results(player_name=repr(player))
+            for player, stats in zip(players, snapshot)
+        ]
+
+
+STRATEGY_OPTIONS = _build_strategy_options()
+STRATEGY_OPTIONS_SORTED = _sorted_strategy_options()
 
 RULE_OPTIONS = {
     "Standard House Rules": HouseRules(),
+    "Continuous Shuffle Machine": HouseRules(continuous_reshuffle=True),
+    "Infinite Deck": HouseRules(infinite_deck=True),
 }
 
 PLAYER_COLORS = ["blue", "red", "green", "orange"]
 
+MAX_HANDS = 2_000_000
+SNAPSHOT_MIN_HANDS = 1000
+SNAPSHOT_COUNT = 50
+
 if "num_players" not in st.session_state:
     st.session_state.num_players = 1
 
@@ -92,21 +150,22 @@ def render_player_settings(player_num):
     return strategy, rules
 
 
-def render_detailed_metrics(result, bankroll_history, color):
+def render_detailed_metrics(result, color):
     with st.expander(f":{color}[Detailed Metrics]"):
         col1, col2, col3, col4 = st.columns(4)
 
         with col1:
-            st.markdown(f"**Final Bankroll**  \n${bankroll_history[-1]:.0f}")
+            st.markdown(f"**Final Bankroll**  \n${result['final_bankroll']:.0f}")
 
         with col2:
-            st.markdown(f"**Starting Bankroll**  \n${bankroll_history[0]:.0f}")
+            starting_bankroll = result["final_bankroll"] - result["net_profit"]
+            st.markdown(f"**Starting Bankroll**  \n${starting_bankroll:.0f}")
 
         with col3:
-            st.markdown(f"**Peak Bankroll**  \n${max(bankroll_history):.0f}")
+            st.markdown(f"**Peak Bankroll**  \n${result['peak_bankroll']:.0f}")
 
         with col4:
-            st.markdown(f"**Minimum Bankroll**  \n${min(bankroll_history):.0f}")
+            st.markdown(f"**Minimum Bankroll**  \n${result['min_bankroll']:.0f}")
 
         col1, col2, col3, col4 = st.columns(4)
 
@@ -124,6 +183,52 @@ def render_detailed_metrics(result, bankroll_history, color):
             st.markdown(f"**Losses**  \n{result.get('losses', 0)}")
 
 
+def render_results(results):
+    max_len = max(len(r["bankroll_history"]) for r in results)
+    padded_data = {}
+    for i, r in enumerate(results):
+        history = r["bankroll_history"]
+        if len(history) < max_len:
+            history = history + [history[-1]] * (max_len - len(history))
+        padded_data[f"Player {i + 1}"] = history
+
+    df = pd.DataFrame(padded_data)
+    st.line_chart(
+        df,
+        color=["#1f77b4", "#d62728", "#2ca02c", "#ff7f0e"][: len(results)],
+        use_container_width=True,
+    )
+
+    cols = st.columns(len(results))
+
+    profits = [r["net_profit"] for r in results]
+    best_player_idx = profits.index(max(profits))
+
+    for i, (result, col, color) in enumerate(zip(results, cols, PLAYER_COLORS)):
+        final_profit = result["net_profit"]
+        starting_bankroll = result["final_bankroll"] - final_profit
+        profit_pct = (
+            (final_profit / starting_bankroll) * 100 if starting_bankroll > 0 else 0
+        )
+        win_rate = (result.get("wins", 0) / result.get("total_games", 1)) * 100
+        winner_mark = " 🏆" if i == best_player_idx else ""
+
+        with col:
+            st.markdown(f"### :{color}[Player {i + 1}]")
+            st.metric("Win Rate", f"{win_rate:.1f}%")
+
+            if final_profit >= 0:
+                st.success(
+                    f"**Profit:** ${final_profit:+.0f} ({profit_pct:+.1f}%) {winner_mark}"
+                )
+            else:
+                st.error(
+                    f"**Loss:** ${final_profit:+.0f} ({profit_pct:+.1f}%) {winner_mark}"
+                )
+
+            render_detailed_metrics(result, color)
+
+
 st.title("Blackjack")
 st.markdown(
     "Simulate different blackjack player strategies and analyze their performance."
@@ -143,101 +248,69 @@ if st.session_state.num_players < 4:
 
 for i, (strategy, _) in enumerate(player_configs):
     if strategy == "Q-Learning AI":
-        model_path = Path("blackjack/_models/q_learning_player.pkl")
-
         col1, col2 = st.columns([3, 1])
         with col1:
-            if model_path.exists():
+            if MODEL_PATH.exists():
                 st.caption(
-                    f"ℹ️ Player {i + 1}: Model loaded ({model_path.stat().st_size // 1024} KB)"
+                    f"ℹ️ Player {i + 1}: Model loaded ({MODEL_PATH.stat().st_size // 1024} KB)"
                 )
+                # The run uses the first player's rules
+                if not _load_q_model(str(MODEL_PATH)).check_rules(RULE_OPTIONS[player_configs[0][1]]):
+                    st.caption(f"⚠️ Player {i + 1}: Model was trained under different house rules")
             else:
-                st.caption(f"⚠️ Player {i + 1}: No trained model found at {model_path}")
+                st.caption(f"⚠️ Player {i + 1}: No trained model found at {MODEL_PATH}")
 
 st.divider()
 
 num_hands = st.slider(
     "Number of Hands to Simulate",
-    min_value=10,
-    max_value=10000,
+    min_value=1000,
+    max_value=MAX_HANDS,
     value=1000,
-    step=10,
+    step=1000,
     help="How many hands should each player play?",
 )
 
+seed = st.number_input(
+    "Random Seed",
+    min_value=0,
+    value=0,
+    step=1,
+    help="Runs with the same players, rules, hands and seed are reused from the cache",
+)
+
 if st.button(
     "Run Simulation", key="run_sim_button", type="primary", use_container_width=True
 ):
-    players = []
-    model_path = Path("blackjack/_models/q_learning_player.pkl")
-
-    for strategy, _ in player_configs:
-        cls = STRATEGY_OPTIONS_SORTED[strategy]
-        if cls.__name__ == "QLearningPlayer":
-            p = cls(bankroll=1000, training_mode=False, epsilon=0.0)
-            p.load_model(str(model_path))
-
-        else:
-            try:
-                p = cls(bankroll=1000)
-            except TypeError:
-                p = cls()
-        players.append(p)
-
-    rules = RULE_OPTIONS[player_configs[0][1]]
-
-    with st.spinner("Running simulation..."):
-        results = run_sim(players=players, rules=rules, num_hands=num_hands)
+    strategies = tuple(strategy for strategy, _ in player_configs)
+    rules_name = player_configs[0][1]
+    key = _cache_key(strategies, rules_name, num_hands, int(seed))
 
     st.header("Simulation Results")
 
-    if results and all(r.get("bankroll_history") for r in results):
-        max_len = max(len(r["bankroll_history"]) for r in results)
-        padded_data = {}
-        for i, r in enumerate(results):
-            history = r["bankroll_history"]
-            if len(history) < max_len:
-                history = history + [history[-1]] * (max_len - len(history))
-            padded_data[f"Player {i + 1}"] = history
-
-        df = pd.DataFrame(padded_data)
-        st.line_chart(
-            df,
-            color=["#1f77b4", "#d62728", "#2ca02c", "#ff7f0e"][: len(results)],
-            use_container_width=True,
-        )
+    results = _result_cache().get(key)
+    if results is None:
+        progress = st.progress(0.0, text="Running simulation...")
+        # Any interaction reruns the page, which stops the generator mid-run
+        st.button("Cancel", key="cancel_sim_button", use_container_width=True)
+        live = st.empty()
+
+        # Sessions asking for the same run wait for the first one's result
+        for results in _result_cache().get_or_stream(
+            key, lambda: _stream_results(strategies, rules_name, num_hands, int(seed))
+        ):
+            hands_played = max(r["total_games"] for r in results)
+            progress.progress(
+                min(hands_played / num_hands, 1.0),
+                text=f"Running simulation... {hands_played:,} / {num_hands:,} hands",
+            )
+            if all(r.get("bankroll_history") for r in results):
+                with live.container():
+                    render_results(results)
 
-        cols = st.columns(len(results))
+        progress.empty()
+    elif all(r.get("bankroll_history") for r in results):
+        render_results(results)
 
-        profits = [
-            r["bankroll_history"][-1] - r["bankroll_history"][0] for r in results
-        ]
-        best_player_idx = profits.index(max(profits))
-
-        for i, (result, col, color) in enumerate(zip(results, cols, PLAYER_COLORS)):
-            bankroll_history = result["bankroll_history"]
-            final_profit = bankroll_history[-1] - bankroll_history[0]
-            profit_pct = (
-                (final_profit / bankroll_history[0]) * 100
-                if bankroll_history[0] > 0
-                else 0
-            )
-            win_rate = (result.get("wins", 0) / result.get("total_games", 1)) * 100
-            winner_mark = " 🏆" if i == best_player_idx else ""
-
-            with col:
-                st.markdown(f"### :{color}[Player {i + 1}]")
-                st.metric("Win Rate", f"{win_rate:.1f}%")
-
-                if final_profit >= 0:
-                    st.success(
-                        f"**Profit:** ${final_profit:+.0f} ({profit_pct:+.1f}%) {winner_mark}"
-                    )
-                else:
-                    st.error(
-                        f"**Loss:** ${final_profit:+.0f} ({profit_pct:+.1f}%) {winner_mark}"
-                    )
-
-                render_detailed_metrics(result, bankroll_history, color)
-    else:
+    if not results or not all(r.get("bankroll_history") for r in results):
         st.error("Simulation failed to produce results.")